@@ -32,6 +32,26 @@ def create_app(config_name='default'):
     # Load configuration
     app.config.from_object(config[config_name])
     
+    # Client IPs from the load balancer's X-Forwarded-For, so per-IP rate
+    # limits and activity logs see clients rather than the proxy
+    hops = app.config.get('PROXY_FIX_HOPS', 0)
+    if hops:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops, x_host=hops)
+    
+    # Encode API responses with orjson when it is installed (JSON_PROVIDER)
+    from app.utils.json_provider import ORJSONProvider, orjson
+    if app.config.get('JSON_PROVIDER') == 'orjson':
+        if orjson is not None:
+            app.json = ORJSONProvider(app)
+        else:
+            logging.getLogger(__name__).warning('JSON_PROVIDER is orjson but orjson is not installed, '
+                                                'using the standard library encoder')
+    
+    # Time pool checkouts (must run before the engine is created)
+    from app.services.metrics_service import MetricsService
+    MetricsService.configure_engine(app)
+    
     # Initialize extensions with app
     db.init_app(app)
     migrate.init_app(app, db)
@@ -41,6 +61,33 @@ def create_app(config_name='default'):
     limiter.init_app(app)
     csrf.init_app(app)
     
+    # In-process tier in front of the shared cache (CACHE_LOCAL_ENABLED)
+    from app.services.local_cache import local_cache
+    local_cache.init_app(app)
+    
+    # Per-route limits behind the rate_limit decorator
+    from app.services.rate_limit_service import RateLimitService
+    RateLimitService.init_app(app)
+    
+    # Background activity writer (only used when ACTIVITY_LOG_MODE is 'async')
+    from app.services.activity_writer import activity_writer
+    activity_writer.init_app(app)
+    
+    # Bloom filter of taken usernames and emails, built on first use
+    from app.services.identity_filter import identity_filter
+    identity_filter.init_app(app)
+    
+    # Request, pool and cache metrics served on /metrics
+    MetricsService.init_app(app)
+    
+    # Count SQL statements per request (SQL_INSTRUMENTATION)
+    from app.utils.query_counter import QueryCounter
+    QueryCounter.init_app(app)
+    
+    # Compile role permissions into bitmasks once per process
+    from app.services.authorization_service import AuthorizationService
+    AuthorizationService.compile_permissions()
+    
     # Register context processors
     from app.context_processors import user_context_processor
     app.context_processor(user_context_processor)
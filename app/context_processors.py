@@ -1,6 +1,6 @@
 from flask import g, request
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
-from app.repositories.user_repository import UserRepository
+from app.services.principal_service import PrincipalService
 from jwt.exceptions import InvalidTokenError
 
 def user_context_processor():
@@ -15,7 +15,7 @@ def user_context_processor():
         user_id = get_jwt_identity()
         
         if user_id:
-            user = UserRepository.get_by_id(user_id)
+            user = PrincipalService.get(user_id)
             if user:
                 current_user = {
                     'is_authenticated': True,
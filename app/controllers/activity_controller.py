@@ -1,7 +1,10 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from app.services.activity_service import ActivityService
-from flask_jwt_extended import jwt_required
+from app.services.activity_stats_service import ActivityStatsService
+from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.utils.decorators import admin_required
+from app.utils.pagination import InvalidCursorError
+from datetime import date, datetime
 
 activity_bp = Blueprint('activity', __name__)
 
@@ -12,6 +15,20 @@ def get_all_activities():
     """Get all activities (admin only)"""
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
+    cursor = request.args.get('cursor')
+    
+    # Cursor mode: seek instead of OFFSET, an empty cursor starts at the newest
+    if cursor is not None:
+        try:
+            activities, next_cursor = ActivityService.get_all_activities_after(cursor, per_page)
+        except InvalidCursorError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        
+        return jsonify({
+            'activities': activities,
+            'per_page': per_page,
+            'next_cursor': next_cursor
+        }), 200
     
     activities = ActivityService.get_all_activities(page, per_page)
     
@@ -28,6 +45,20 @@ def get_user_activities(user_id):
     """Get activities for a specific user (admin only)"""
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
+    cursor = request.args.get('cursor')
+    
+    if cursor is not None:
+        try:
+            activities, next_cursor = ActivityService.get_user_activities_after(user_id, cursor, per_page)
+        except InvalidCursorError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        
+        return jsonify({
+            'activities': activities,
+            'user_id': user_id,
+            'per_page': per_page,
+            'next_cursor': next_cursor
+        }), 200
     
     activities = ActivityService.get_user_activities(user_id, page, per_page)
     
@@ -38,3 +69,72 @@ def get_user_activities(user_id):
         'per_page': per_page
     }), 200
 
+@activity_bp.route('/export', methods=['GET'])
+@jwt_required()
+@admin_required()
+def export_activities():
+    """Stream activities as NDJSON or CSV (admin only)
+    
+    Filters: user_id, since, until (ISO 8601, until exclusive). To resume an
+    interrupted export pass after_timestamp and after_id of the last row received.
+    """
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in ('ndjson', 'csv'):
+        return jsonify({'error': 'format must be ndjson or csv'}), 400
+    
+    user_id = request.args.get('user_id', type=int)
+    try:
+        since = _parse_time(request.args.get('since'))
+        until = _parse_time(request.args.get('until'))
+        after = None
+        if request.args.get('after_id') is not None or request.args.get('after_timestamp') is not None:
+            after = (datetime.fromisoformat(request.args['after_timestamp']), int(request.args['after_id']))
+    except (KeyError, ValueError):
+        return jsonify({'error': 'Invalid since, until or resume position'}), 400
+    
+    ActivityService.log_activity(
+        user_id=get_jwt_identity(),
+        action='activities_exported',
+        details=f'Activity export ({fmt}) user_id={user_id} since={since} until={until}',
+        request=request
+    )
+    
+    chunks = ActivityService.export_activities(fmt, user_id, since, until, after)
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=activities.{fmt}'}
+    )
+
+@activity_bp.route('/stats', methods=['GET'])
+@jwt_required()
+@admin_required()
+def get_activity_stats():
+    """Get activity counts per day, week or month from the rollups (admin only)
+    
+    Filters: since, until (ISO dates, inclusive), action (comma separated) and
+    user_id when per-user rollups are enabled. Activities newer than the last
+    rollup run are not counted yet; last_activity_id tells how far it got.
+    """
+    bucket = request.args.get('bucket', 'day')
+    actions = [action for action in request.args.get('action', '').split(',') if action]
+    user_id = request.args.get('user_id', type=int)
+    try:
+        since = _parse_date(request.args.get('since'))
+        until = _parse_date(request.args.get('until'))
+    except ValueError:
+        return jsonify({'error': 'since and until must be ISO dates'}), 400
+    
+    try:
+        stats = ActivityStatsService.get_stats(bucket, since, until, actions, user_id)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(stats), 200
+
+def _parse_date(value):
+    return date.fromisoformat(value) if value else None
+
+def _parse_time(value):
+    return datetime.fromisoformat(value) if value else None
@@ -1,7 +1,10 @@
 from flask import Blueprint, request, jsonify, current_app
 from app.services.user_service import UserService
+from app.services.user_import_service import UserImportService
+from app.services.activity_service import ActivityService
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.utils.decorators import admin_required, validate_json
+from app.utils.http_cache import conditional_user
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -12,13 +15,15 @@ def get_users():
     """Get all users"""
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
+    cursor = request.args.get('cursor')
     
-    result, status_code = UserService.get_all_users(page, per_page)
+    result, status_code = UserService.get_all_users(page, per_page, cursor)
     return jsonify(result), status_code
 
 @admin_bp.route('/users/<int:user_id>', methods=['GET'])
 @jwt_required()
 @admin_required()
+@conditional_user('id', 'username', 'email', 'role', 'is_active', 'created_at', 'last_login', user_id_arg='user_id')
 def get_user(user_id):
     """Get user by ID"""
     result, status_code = UserService.get_user_by_id(user_id)
@@ -34,6 +39,53 @@ def create_user():
     result, status_code = UserService.create_user(data)
     return jsonify(result), status_code
 
+@admin_bp.route('/users/bulk', methods=['POST'])
+@jwt_required()
+@admin_required()
+@validate_json('user_ids', 'operation')
+def bulk_update_users():
+    """Activate, deactivate, soft-delete or change the role of many users"""
+    data = request.get_json()
+    user_ids = data.get('user_ids')
+    operation = data.get('operation')
+    admin_id = get_jwt_identity()
+    
+    # Same self-protection rules as the single-user endpoints
+    if isinstance(user_ids, list) and admin_id in user_ids:
+        if operation == 'deactivate':
+            return jsonify({'error': 'Admins cannot deactivate their own account'}), 400
+        if operation == 'soft_delete':
+            return jsonify({'error': 'Admins cannot delete their own account'}), 400
+        if operation == 'change_role' and data.get('role') != 'admin':
+            return jsonify({'error': 'Admins cannot remove their own admin privileges'}), 400
+    
+    current_app.logger.info(f"Bulk {operation} of {len(user_ids) if isinstance(user_ids, list) else 0} users")
+    result, status_code = UserService.bulk_update_users(user_ids, operation, data.get('role'))
+    return jsonify(result), status_code
+
+@admin_bp.route('/users/import', methods=['POST'])
+@jwt_required()
+@admin_required()
+def import_users():
+    """Import users from a CSV or JSON Lines request body"""
+    fmt = request.args.get('format')
+    if not fmt:
+        fmt = 'jsonl' if 'json' in (request.content_type or '') else 'csv'
+    if fmt not in UserImportService.FORMATS:
+        return jsonify({'error': 'format must be csv or jsonl'}), 400
+    
+    # Read the body as a stream so large files are never held in memory whole
+    report = UserImportService.import_users(request.stream, fmt, default_role=request.args.get('role', 'user'))
+    
+    ActivityService.log_activity(
+        user_id=get_jwt_identity(),
+        action='users_imported',
+        details=f"Imported {report['created']} of {report['processed']} users",
+        request=request
+    )
+    current_app.logger.info(f"Imported {report['created']} of {report['processed']} users")
+    return jsonify(report), 200
+
 @admin_bp.route('/users/<int:user_id>', methods=['PUT'])
 @jwt_required()
 @admin_required()
@@ -1,11 +1,13 @@
 from flask import Blueprint, request, jsonify, make_response
 from app.services.auth_service import AuthService
-from app.utils.decorators import validate_json
+from app.services.availability_service import AvailabilityService
+from app.utils.decorators import validate_json, rate_limit
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 auth_bp = Blueprint('auth', __name__)
 
 @auth_bp.route('/register', methods=['POST'])
+@rate_limit(20, 3600, key_by='ip')
 @validate_json('username', 'email', 'password')
 def register():
     """Register a new user"""
@@ -13,7 +15,23 @@ def register():
     result, status_code = AuthService.register(data)
     return jsonify(result), status_code
 
+@auth_bp.route('/availability', methods=['GET'])
+@rate_limit(60, 60, key_by='ip')
+def availability():
+    """Check whether a username and/or email is free, for the register form
+    
+    Advisory: a name taken moments ago in another process may still show as
+    available (see BLOOM_REBUILD_INTERVAL), registration itself is checked
+    against the unique indexes.
+    """
+    result, status_code = AvailabilityService.check(
+        request.args.get('username'),
+        request.args.get('email')
+    )
+    return jsonify(result), status_code
+
 @auth_bp.route('/login', methods=['POST'])
+@rate_limit(10, 60, key_by='ip')
 @validate_json('username', 'password')
 def login():
     """Login a user"""
@@ -51,6 +69,7 @@ def logout():
     return response
 
 @auth_bp.route('/refresh', methods=['POST'])
+@rate_limit(30, 60, key_by='ip')
 @validate_json('refresh_token')
 def refresh():
     """Refresh access token"""
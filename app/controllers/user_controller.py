@@ -2,11 +2,14 @@ from flask import Blueprint, request, jsonify
 from app.services.user_service import UserService
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.utils.decorators import permission_required, validate_json
+from app.utils.pagination import InvalidCursorError
+from app.utils.http_cache import conditional_user
 
 user_bp = Blueprint('user', __name__)
 
 @user_bp.route('/profile', methods=['GET'])
 @jwt_required()
+@conditional_user('id', 'username', 'email', 'role', 'created_at', 'last_login')
 def get_profile():
     """Get current user profile"""
     user_id = get_jwt_identity()
@@ -44,8 +47,22 @@ def get_activities():
     user_id = get_jwt_identity()
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
+    cursor = request.args.get('cursor')
     
     from app.services.activity_service import ActivityService
+    
+    if cursor is not None:
+        try:
+            activities, next_cursor = ActivityService.get_user_activities_after(user_id, cursor, per_page)
+        except InvalidCursorError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        
+        return jsonify({
+            'activities': activities,
+            'per_page': per_page,
+            'next_cursor': next_cursor
+        }), 200
+    
     activities = ActivityService.get_user_activities(user_id, page, per_page)
     
     return jsonify({
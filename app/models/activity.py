@@ -4,14 +4,21 @@ from datetime import datetime
 class Activity(db.Model):
     """Activity model for tracking user activities"""
     __tablename__ = 'activities'
+    __table_args__ = (
+        # Keyset pagination seeks on (timestamp, id), globally and per user
+        db.Index('ix_activities_timestamp_id', 'timestamp', 'id'),
+        db.Index('ix_activities_user_id_timestamp_id', 'user_id', 'timestamp', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    # No foreign key on any dialect: MySQL cannot partition a table that has
+    # one (see the partitioning migration); User.activities joins explicitly instead
+    user_id = db.Column(db.Integer, nullable=False)
     action = db.Column(db.String(100), nullable=False)
     details = db.Column(db.Text, nullable=True)
     ip_address = db.Column(db.String(45), nullable=True)
     user_agent = db.Column(db.String(255), nullable=True)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # Monthly partition key on MySQL
     
     def __repr__(self):
         return f'<Activity {self.action} by User {self.user_id}>'
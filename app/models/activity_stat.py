@@ -0,0 +1,25 @@
+from app import db
+
+class ActivityDailyStat(db.Model):
+    """Activity counts per day and action, overall (user_id 0) and per user"""
+    __tablename__ = 'activity_daily_stats'
+    
+    # Key order serves "one user (or everyone), a range of days" as a range scan
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # 0 = all users
+    day = db.Column(db.Date, primary_key=True)
+    action = db.Column(db.String(100), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<ActivityDailyStat {self.day} {self.action} user {self.user_id}: {self.count}>'
+
+class ActivityStatsState(db.Model):
+    """Watermark of the last activity id folded into the rollups"""
+    __tablename__ = 'activity_stats_state'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    last_id = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f'<ActivityStatsState {self.name}: {self.last_id}>'
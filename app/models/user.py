@@ -1,6 +1,6 @@
 from app import db
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.services.password_service import PasswordService
 
 class User(db.Model):
     """User model for storing user related details"""
@@ -16,9 +16,15 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_login = db.Column(db.DateTime, nullable=True)
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Bumped to revoke access tokens
     
     # Relationships
-    activities = db.relationship('Activity', backref='user', lazy='dynamic')
+    activities = db.relationship(
+        'Activity',
+        primaryjoin='User.id == foreign(Activity.user_id)',
+        backref='user',
+        lazy='dynamic'
+    )
     
     @property
     def password(self):
@@ -28,11 +34,15 @@ class User(db.Model):
     @password.setter
     def password(self, password):
         """Set password to a hashed password"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = PasswordService.hash(password)
     
     def verify_password(self, password):
         """Check if password matches"""
-        return check_password_hash(self.password_hash, password)
+        return PasswordService.verify(self.password_hash, password)
+    
+    def needs_rehash(self):
+        """Check if the stored hash uses outdated hashing parameters"""
+        return PasswordService.needs_rehash(self.password_hash)
     
     def is_admin(self):
         """Check if user is admin"""
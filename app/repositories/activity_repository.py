@@ -1,54 +1,185 @@
 from app import db
 from app.models.activity import Activity
+from app.utils.pagination import encode_cursor, decode_cursor, page_bounds, InvalidCursorError
+from sqlalchemy import Select, and_, or_, select
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import SQLAlchemyError
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Tuple
+from datetime import datetime
 
 class ActivityRepository:
     """Repository for Activity model operations"""
     
+    # Columns the list endpoints emit, read as Core rows: no Activity objects,
+    # identity map entries or change tracking for pages of hundreds of rows
+    LIST_COLUMNS = ('id', 'user_id', 'action', 'details', 'ip_address', 'user_agent', 'timestamp')
+    
     @staticmethod
-    def create(activity_data: Dict[str, Any]) -> Optional[Activity]:
-        """Create a new activity record"""
+    def create(activity_data: Dict[str, Any], commit: bool = True) -> Optional[Activity]:
+        """Create a new activity record, left pending in the session if commit is False"""
         try:
             activity = Activity(
                 user_id=activity_data.get('user_id'),
                 action=activity_data.get('action'),
                 details=activity_data.get('details'),
                 ip_address=activity_data.get('ip_address'),
-                user_agent=activity_data.get('user_agent')
+                user_agent=activity_data.get('user_agent'),
+                timestamp=activity_data.get('timestamp') or datetime.utcnow()
             )
             
             db.session.add(activity)
-            db.session.commit()
+            if commit:
+                db.session.commit()
             return activity
         except SQLAlchemyError as e:
             db.session.rollback()
             raise e
     
+    @staticmethod
+    def create_many(activities_data: List[Dict[str, Any]], commit: bool = True) -> int:
+        """Create several activity records with one multi-row INSERT"""
+        if not activities_data:
+            return 0
+        
+        rows = [
+            {
+                'user_id': activity_data.get('user_id'),
+                'action': activity_data.get('action'),
+                'details': activity_data.get('details'),
+                'ip_address': activity_data.get('ip_address'),
+                'user_agent': activity_data.get('user_agent'),
+                'timestamp': activity_data.get('timestamp') or datetime.utcnow()
+            }
+            for activity_data in activities_data
+        ]
+        
+        try:
+            # executemany on a plain INSERT is rewritten by PyMySQL into multi-row VALUES
+            db.session.execute(Activity.__table__.insert(), rows)
+            if commit:
+                db.session.commit()
+            return len(rows)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+    
     @staticmethod
     def get_by_id(activity_id: int) -> Optional[Activity]:
         """Get activity by ID"""
         return Activity.query.get(activity_id)
     
     @staticmethod
-    def get_by_user_id(user_id: int, page: int = 1, per_page: int = 20) -> List[Activity]:
-        """Get activities by user ID with pagination"""
-        return Activity.query.filter_by(user_id=user_id).order_by(
-            Activity.timestamp.desc()
-        ).paginate(page=page, per_page=per_page, error_out=False).items
+    def get_by_user_id(user_id: int, page: int = 1, per_page: int = 20) -> List[Row]:
+        """Get activity rows by user ID with pagination"""
+        table = Activity.__table__
+        limit, offset = page_bounds(page, per_page)
+        query = ActivityRepository._list_query().where(table.c.user_id == user_id).order_by(
+            table.c.timestamp.desc(), table.c.id.desc()
+        ).limit(limit).offset(offset)
+        return db.session.execute(query).all()
+    
+    @staticmethod
+    def get_by_user_id_after(user_id: int, cursor: Optional[str] = None,
+                             per_page: int = 20) -> Tuple[List[Row], Optional[str]]:
+        """Get activity rows by user ID after a keyset cursor"""
+        query = ActivityRepository._list_query().where(Activity.__table__.c.user_id == user_id)
+        return ActivityRepository._seek(query, cursor, per_page)
     
     @staticmethod
-    def get_all(page: int = 1, per_page: int = 20) -> List[Activity]:
-        """Get all activities with pagination"""
-        return Activity.query.order_by(
-            Activity.timestamp.desc()
-        ).paginate(page=page, per_page=per_page, error_out=False).items
+    def get_all(page: int = 1, per_page: int = 20) -> List[Row]:
+        """Get all activity rows with pagination"""
+        table = Activity.__table__
+        limit, offset = page_bounds(page, per_page)
+        query = ActivityRepository._list_query().order_by(
+            table.c.timestamp.desc(), table.c.id.desc()
+        ).limit(limit).offset(offset)
+        return db.session.execute(query).all()
+    
+    @staticmethod
+    def get_all_after(cursor: Optional[str] = None, per_page: int = 20) -> Tuple[List[Row], Optional[str]]:
+        """Get all activity rows after a keyset cursor"""
+        return ActivityRepository._seek(ActivityRepository._list_query(), cursor, per_page)
+    
+    @staticmethod
+    def _list_query() -> Select:
+        table = Activity.__table__
+        return select(*(table.c[name] for name in ActivityRepository.LIST_COLUMNS))
+    
+    @staticmethod
+    def _seek(query: Select, cursor: Optional[str], per_page: int) -> Tuple[List[Row], Optional[str]]:
+        """Seek on (timestamp, id) descending instead of using OFFSET"""
+        table = Activity.__table__
+        if cursor:
+            position = decode_cursor(cursor)
+            try:
+                timestamp = datetime.fromisoformat(position['ts'])
+                last_id = int(position['id'])
+            except (KeyError, TypeError, ValueError):
+                raise InvalidCursorError('Invalid cursor')
+            
+            # Expanded row comparison so MySQL can range-scan the composite index
+            query = query.where(or_(
+                table.c.timestamp < timestamp,
+                and_(table.c.timestamp == timestamp, table.c.id < last_id)
+            ))
+        
+        per_page = max(per_page, 1)
+        activities = db.session.execute(query.order_by(
+            table.c.timestamp.desc(), table.c.id.desc()
+        ).limit(per_page + 1)).all()
+        
+        next_cursor = None
+        if len(activities) > per_page:
+            activities = activities[:per_page]
+            last = activities[-1]
+            next_cursor = encode_cursor({'ts': last.timestamp.isoformat(), 'id': last.id})
+        
+        return activities, next_cursor
+    
+    @staticmethod
+    def stream_for_export(user_id: Optional[int] = None, since: Optional[datetime] = None,
+                          until: Optional[datetime] = None, after: Optional[Tuple[datetime, int]] = None,
+                          batch_size: int = 1000) -> Iterator[Row]:
+        """Yield activity rows oldest first from a server-side cursor on a dedicated connection
+        
+        Rows come in (timestamp, id) order, so an interrupted export resumes with
+        after=(timestamp, id) of the last row received.
+        """
+        table = Activity.__table__
+        query = ActivityRepository._list_query()
+        
+        if user_id is not None:
+            query = query.where(table.c.user_id == user_id)
+        if since is not None:
+            query = query.where(table.c.timestamp >= since)
+        if until is not None:
+            query = query.where(table.c.timestamp < until)
+        if after is not None:
+            timestamp, last_id = after
+            query = query.where(or_(
+                table.c.timestamp > timestamp,
+                and_(table.c.timestamp == timestamp, table.c.id > last_id)
+            ))
+        
+        # Same order as the keyset indexes, so the database never sorts the export
+        query = query.order_by(table.c.timestamp, table.c.id)
+        
+        # Not the request session: the stream outlives the view function, and
+        # stream_results gives PyMySQL an unbuffered SSCursor
+        with db.engine.connect() as connection:
+            result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+            yield from result
     
     @staticmethod
     def delete(activity: Activity) -> bool:
         """Delete an activity"""
         try:
-            db.session.delete(activity)
+            # Match on the timestamp too so MySQL only touches one partition
+            table = Activity.__table__
+            db.session.execute(
+                table.delete().where(table.c.id == activity.id, table.c.timestamp == activity.timestamp)
+            )
+            db.session.expunge(activity)
             db.session.commit()
             return True
         except SQLAlchemyError as e:
@@ -0,0 +1,119 @@
+from app import db
+from app.models.activity import Activity
+from app.models.activity_stat import ActivityDailyStat, ActivityStatsState
+from sqlalchemy import func, literal, select
+from sqlalchemy.engine import Connection, Row
+from sqlalchemy.exc import IntegrityError
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+
+class ActivityStatsRepository:
+    """Repository for the activity rollup tables"""
+    
+    STATE_NAME = 'activity_daily_stats'
+    
+    @staticmethod
+    def get_state() -> Optional[ActivityStatsState]:
+        """Get the rollup watermark, None before the first run"""
+        return ActivityStatsState.query.get(ActivityStatsRepository.STATE_NAME)
+    
+    @staticmethod
+    def get_pending_range(cutoff: datetime) -> Tuple[int, Optional[int]]:
+        """Get the watermark and the highest new activity id written before cutoff"""
+        activities = Activity.__table__
+        
+        with db.engine.connect() as connection:
+            last_id = ActivityStatsRepository._ensure_state(connection)
+            upper_id = connection.execute(
+                select(func.max(activities.c.id)).where(
+                    activities.c.id > last_id, activities.c.timestamp <= cutoff
+                )
+            ).scalar()
+        
+        return last_id, upper_id
+    
+    @staticmethod
+    def fold(last_id: int, upper_id: int, per_user: bool = False) -> bool:
+        """Add activities with ids in (last_id, upper_id] to the rollups and move the watermark
+        
+        Counts and watermark commit together, so a crash never counts a row twice.
+        Returns False without changing anything if another run moved the watermark first.
+        """
+        state = ActivityStatsState.__table__
+        
+        with db.engine.begin() as connection:
+            # Claim the range first: a concurrent run with the same last_id updates nothing
+            claimed = connection.execute(
+                state.update()
+                .where(state.c.name == ActivityStatsRepository.STATE_NAME, state.c.last_id == last_id)
+                .values(last_id=upper_id, updated_at=datetime.utcnow())
+            ).rowcount
+            if not claimed:
+                return False
+            
+            connection.execute(ActivityStatsRepository._upsert(connection, last_id, upper_id, False))
+            if per_user:
+                connection.execute(ActivityStatsRepository._upsert(connection, last_id, upper_id, True))
+        
+        return True
+    
+    @staticmethod
+    def get_counts(since: Optional[date] = None, until: Optional[date] = None,
+                   actions: Optional[List[str]] = None, user_id: int = 0) -> List[Row]:
+        """Get (day, action, count) rows of one user, or of everyone with user_id 0"""
+        table = ActivityDailyStat.__table__
+        query = select(table.c.day, table.c.action, table.c['count']).where(table.c.user_id == user_id)
+        
+        if since is not None:
+            query = query.where(table.c.day >= since)
+        if until is not None:
+            query = query.where(table.c.day <= until)
+        if actions:
+            query = query.where(table.c.action.in_(actions))
+        
+        return db.session.execute(query.order_by(table.c.day, table.c.action)).all()
+    
+    @staticmethod
+    def _ensure_state(connection: Connection) -> int:
+        state = ActivityStatsState.__table__
+        last_id = connection.execute(
+            select(state.c.last_id).where(state.c.name == ActivityStatsRepository.STATE_NAME)
+        ).scalar()
+        if last_id is not None:
+            return last_id
+        
+        try:
+            connection.execute(state.insert().values(name=ActivityStatsRepository.STATE_NAME, last_id=0))
+            connection.commit()
+        except IntegrityError:
+            # Created by a concurrent first run
+            connection.rollback()
+        return 0
+    
+    @staticmethod
+    def _upsert(connection: Connection, last_id: int, upper_id: int, per_user: bool):
+        """INSERT ... SELECT the range's counts, adding to rows that already exist"""
+        activities = Activity.__table__
+        table = ActivityDailyStat.__table__
+        day = func.date(activities.c.timestamp)
+        user = activities.c.user_id if per_user else literal(0)
+        
+        counts = select(user, day, activities.c.action, func.count()).where(
+            activities.c.id > last_id, activities.c.id <= upper_id
+        ).group_by(*([user] if per_user else []), day, activities.c.action)
+        columns = ['user_id', 'day', 'action', 'count']
+        
+        if connection.dialect.name == 'mysql':
+            from sqlalchemy.dialects.mysql import insert
+            stmt = insert(table).from_select(columns, counts)
+            return stmt.on_duplicate_key_update(count=table.c['count'] + stmt.inserted['count'])
+        
+        if connection.dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table).from_select(columns, counts)
+        return stmt.on_conflict_do_update(
+            index_elements=['user_id', 'day', 'action'],
+            set_={'count': table.c['count'] + stmt.excluded['count']}
+        )
@@ -1,11 +1,25 @@
 from app import db
 from app.models.user import User
+from app.services.cache_service import CacheService
+from app.services.identity_filter import identity_filter
+from app.utils.pagination import encode_cursor, decode_cursor, page_bounds, InvalidCursorError
+from flask import current_app, g, has_app_context
+from sqlalchemy import Select, or_, select, update
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import SQLAlchemyError
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime
 
 class UserRepository:
     """Repository for User model operations"""
     
+    # Changing any of these revokes the user's outstanding access tokens
+    TOKEN_VERSION_FIELDS = ('role', 'is_active', 'is_deleted')
+    
+    # Columns the admin user list emits, read as Core rows: never password_hash,
+    # and no User objects or identity map entries for a page of users
+    LIST_COLUMNS = ('id', 'username', 'email', 'role', 'is_active', 'created_at', 'last_login')
+    
     @staticmethod
     def create(user_data: Dict[str, Any]) -> Optional[User]:
         """Create a new user"""
@@ -18,7 +32,10 @@ class UserRepository:
             user.password = user_data.get('password')
             
             db.session.add(user)
+            # Recorded before commit: a name that fails to commit is only a false positive
+            identity_filter.add([('username', user_data.get('username')), ('email', user_data.get('email'))])
             db.session.commit()
+            UserRepository.invalidate_cache(user.id)
             return user
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -29,6 +46,79 @@ class UserRepository:
         """Get user by ID"""
         return User.query.get(user_id)
     
+    @staticmethod
+    def get_snapshot(user_id: int) -> Optional[Dict[str, Any]]:
+        """Get a read-only copy of a user's columns, cached across requests"""
+        return CacheService.get_or_load(
+            UserRepository._cache_key(user_id),
+            lambda: UserRepository._load_snapshot(user_id),
+            timeout=current_app.config.get('USER_CACHE_TTL', 60)
+        )
+    
+    @staticmethod
+    def _load_snapshot(user_id: int) -> Optional[Dict[str, Any]]:
+        user = UserRepository.get_by_id(user_id)
+        if not user:
+            return None
+        
+        return {
+            'id': user.id,
+            'username': user.username,
+            'email': user.email,
+            'role': user.role,
+            'is_active': user.is_active,
+            'is_deleted': user.is_deleted,
+            'created_at': user.created_at,
+            'updated_at': user.updated_at,
+            'last_login': user.last_login,
+            'token_version': user.token_version or 0
+        }
+    
+    @staticmethod
+    def get_token_version(user_id: int) -> Optional[int]:
+        """Get the current token version, None if the user no longer exists"""
+        try:
+            snapshot = UserRepository.get_snapshot(int(user_id))
+        except (TypeError, ValueError):
+            return None
+        return snapshot['token_version'] if snapshot else None
+    
+    @staticmethod
+    def invalidate_cache(user_id: int) -> None:
+        """Drop cached copies of a user after a write"""
+        UserRepository.invalidate_many([user_id])
+    
+    @staticmethod
+    def invalidate_many(user_ids: List[int]) -> None:
+        """Drop cached copies of several users and of every user listing"""
+        user_ids = [int(user_id) for user_id in user_ids]
+        cache_keys = [UserRepository._cache_key(user_id) for user_id in user_ids]
+        if cache_keys:
+            CacheService.delete_many(*cache_keys)
+        CacheService.bump_tags('users', *[f'user:{user_id}' for user_id in user_ids])
+        
+        # Also forget the principals memoized for the current request
+        if has_app_context() and 'principals' in g:
+            for user_id in user_ids:
+                g.principals.pop(user_id, None)
+    
+    @staticmethod
+    def _cache_key(user_id: int) -> str:
+        return f'user:snapshot:{int(user_id)}'
+    
+    @staticmethod
+    def get_by_username_or_email(identifier: str) -> Optional[User]:
+        """Get user by username or email in a single query"""
+        users = User.query.filter(
+            or_(User.username == identifier, User.email == identifier)
+        ).limit(2).all()
+        
+        # A username match wins over another account's email, as in the old lookup order
+        for user in users:
+            if user.username.lower() == identifier.lower():
+                return user
+        return users[0] if users else None
+    
     @staticmethod
     def get_by_username(username: str) -> Optional[User]:
         """Get user by username"""
@@ -40,9 +130,39 @@ class UserRepository:
         return User.query.filter_by(email=email).first()
     
     @staticmethod
-    def get_all(page: int = 1, per_page: int = 20) -> List[User]:
-        """Get all users with pagination"""
-        return User.query.paginate(page=page, per_page=per_page, error_out=False).items
+    def get_all(page: int = 1, per_page: int = 20) -> List[Row]:
+        """Get user rows with pagination"""
+        table = User.__table__
+        limit, offset = page_bounds(page, per_page)
+        query = UserRepository._list_query().order_by(table.c.id).limit(limit).offset(offset)
+        return db.session.execute(query).all()
+    
+    @staticmethod
+    def get_all_after(cursor: Optional[str] = None, per_page: int = 20) -> Tuple[List[Row], Optional[str]]:
+        """Get user rows after a keyset cursor, seeking on the primary key"""
+        table = User.__table__
+        query = UserRepository._list_query()
+        if cursor:
+            try:
+                last_id = int(decode_cursor(cursor)['id'])
+            except (KeyError, TypeError, ValueError):
+                raise InvalidCursorError('Invalid cursor')
+            query = query.where(table.c.id > last_id)
+        
+        per_page = max(per_page, 1)
+        users = db.session.execute(query.order_by(table.c.id).limit(per_page + 1)).all()
+        
+        next_cursor = None
+        if len(users) > per_page:
+            users = users[:per_page]
+            next_cursor = encode_cursor({'id': users[-1].id})
+        
+        return users, next_cursor
+    
+    @staticmethod
+    def _list_query() -> Select:
+        table = User.__table__
+        return select(*(table.c[name] for name in UserRepository.LIST_COLUMNS))
     
     @staticmethod
     def update(user: User, user_data: Dict[str, Any]) -> Optional[User]:
@@ -54,18 +174,116 @@ class UserRepository:
                 elif hasattr(user, key):
                     setattr(user, key, value)
             
+            if any(key in user_data for key in UserRepository.TOKEN_VERSION_FIELDS):
+                user.token_version = (user.token_version or 0) + 1
+            
+            # Read the id before commit expires the instance, to avoid a reload
+            user_id = user.id
+            identity_filter.add([(key, user_data[key]) for key in ('username', 'email') if key in user_data])
             db.session.commit()
+            UserRepository.invalidate_cache(user_id)
             return user
         except SQLAlchemyError as e:
             db.session.rollback()
             raise e
     
+    @staticmethod
+    def create_many(users_data: List[Dict[str, Any]], commit: bool = True) -> int:
+        """Insert users whose passwords are already hashed with one multi-row INSERT"""
+        if not users_data:
+            return 0
+        
+        now = datetime.utcnow()
+        rows = [
+            {
+                'username': user_data['username'],
+                'email': user_data['email'],
+                'password_hash': user_data['password_hash'],
+                'role': user_data.get('role', 'user'),
+                'is_active': user_data.get('is_active', True),
+                'is_deleted': False,
+                'created_at': now,
+                'updated_at': now,
+                'token_version': 0
+            }
+            for user_data in users_data
+        ]
+        
+        try:
+            db.session.execute(User.__table__.insert(), rows)
+            identity_filter.add(
+                [('username', row['username']) for row in rows] + [('email', row['email']) for row in rows]
+            )
+            if commit:
+                db.session.commit()
+                UserRepository.invalidate_many([])
+            return len(rows)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+    
+    @staticmethod
+    def get_taken_identities(usernames: List[str], emails: List[str]) -> Tuple[set, set]:
+        """Get which usernames and emails are already in use, lowercased, in one query"""
+        # Names the Bloom filter has never seen cannot be taken
+        usernames = [username for username in usernames if identity_filter.might_exist('username', username)]
+        emails = [email for email in emails if identity_filter.might_exist('email', email)]
+        if not usernames and not emails:
+            return set(), set()
+        
+        rows = db.session.execute(
+            select(User.username, User.email).where(
+                or_(User.username.in_(usernames), User.email.in_(emails))
+            )
+        )
+        taken_usernames, taken_emails = set(), set()
+        for username, email in rows:
+            taken_usernames.add(username.lower())
+            taken_emails.add(email.lower())
+        return taken_usernames, taken_emails
+    
+    @staticmethod
+    def get_existing_ids(user_ids: List[int]) -> List[int]:
+        """Get which of the given ids belong to existing users"""
+        if not user_ids:
+            return []
+        rows = db.session.execute(select(User.id).where(User.id.in_(user_ids)).order_by(User.id))
+        return [row[0] for row in rows]
+    
+    @staticmethod
+    def bulk_update(user_ids: List[int], values: Dict[str, Any], commit: bool = True) -> int:
+        """Apply the same column values to many users with one UPDATE, committing pending writes with it"""
+        if not user_ids:
+            return 0
+        
+        values = dict(values)
+        if any(key in values for key in UserRepository.TOKEN_VERSION_FIELDS):
+            values['token_version'] = User.token_version + 1
+        
+        try:
+            # updated_at is filled in by the column's onupdate
+            result = db.session.execute(
+                update(User).where(User.id.in_(user_ids)).values(**values),
+                execution_options={'synchronize_session': False}
+            )
+            # Instances already loaded in this session predate the UPDATE
+            db.session.expire_all()
+            if commit:
+                db.session.commit()
+                UserRepository.invalidate_many(user_ids)
+            return result.rowcount
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise e
+    
     @staticmethod
     def delete(user: User) -> bool:
         """Delete a user"""
         try:
+            user_id = user.id
             db.session.delete(user)
             db.session.commit()
+            UserRepository.invalidate_cache(user_id)
             return True
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -73,11 +291,12 @@ class UserRepository:
     
     @staticmethod
     def update_last_login(user: User) -> Optional[User]:
-        """Update user's last login timestamp"""
-        from datetime import datetime
+        """Update user's last login timestamp, committing any pending writes with it"""
         try:
             user.last_login = datetime.utcnow()
+            user_id = user.id
             db.session.commit()
+            UserRepository.invalidate_cache(user_id)
             return user
         except SQLAlchemyError as e:
             db.session.rollback()
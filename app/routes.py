@@ -1,18 +1,46 @@
 from flask import Blueprint, render_template, redirect, url_for, current_app, request, flash, jsonify, session
 from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request, get_jwt
 from functools import wraps
-from app.repositories.user_repository import UserRepository
+from app.services.principal_service import PrincipalService
+from app.services.password_service import HashingBusyError
 import jwt
 
 def register_routes(app):
     """Register all application routes"""
     
+    from app import limiter
+    from app.services.metrics_service import MetricsService
+    
     # Health check endpoint
     @app.route('/health')
+    @limiter.exempt
     def health_check():
         """Health check endpoint for monitoring"""
         return {'status': 'ok'}, 200
     
+    # Readiness endpoint for load balancers
+    @app.route('/health/ready')
+    @limiter.exempt
+    def readiness_check():
+        """Report whether the database and Redis backends are reachable"""
+        from app.services.health_service import HealthService
+        result, status_code = HealthService.check_ready()
+        return jsonify(result), status_code
+    
+    # Prometheus scrape endpoint
+    @app.route('/metrics')
+    @limiter.exempt
+    def metrics():
+        """Expose request, pool and cache metrics to scrapers holding METRICS_TOKEN"""
+        if not current_app.config.get('METRICS_ENABLED', True):
+            return jsonify({'error': 'Not found'}), 404
+        if not MetricsService.is_scrape_allowed(current_app):
+            if not current_app.config.get('METRICS_TOKEN'):
+                return jsonify({'error': 'Not found'}), 404
+            return jsonify({'error': 'Unauthorized'}), 401, {'WWW-Authenticate': 'Bearer'}
+        body, content_type = MetricsService.render()
+        return body, 200, {'Content-Type': content_type}
+    
     # Error handlers
     @app.errorhandler(404)
     def not_found_error(error):
@@ -33,6 +61,11 @@ def register_routes(app):
             return jsonify({'error': str(error) or 'Bad Request'}), 400
         return render_template('errors/400.html', error=error), 400
     
+    @app.errorhandler(HashingBusyError)
+    def hashing_busy_error(error):
+        """Shed load when the password hashing pool is saturated"""
+        return jsonify({'error': 'Server busy, please try again shortly'}), 503, {'Retry-After': '1'}
+    
     @app.errorhandler(500)
     def internal_error(error):
         """Handle 500 errors"""
@@ -63,7 +96,7 @@ def register_routes(app):
                     user_id = decoded.get('sub')
                     
                     # Set user in session for template access
-                    user = UserRepository.get_by_id(user_id)
+                    user = PrincipalService.get(user_id)
                     if user:
                         session['user_id'] = user_id
                         session['user_role'] = user.role
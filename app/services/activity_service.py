@@ -1,14 +1,31 @@
+from app.models.activity import Activity
 from app.repositories.activity_repository import ActivityRepository
-from flask import Request
-from typing import Dict, Any, List, Optional
+from app.services.activity_writer import activity_writer
+from app.utils.serializers import RowSerializer
+from flask import Request, current_app
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
+import csv
+import io
+import logging
+
+logger = logging.getLogger(__name__)
 
 class ActivityService:
     """Service for activity tracking operations"""
     
+    EXPORT_FIELDS = ['id', 'user_id', 'action', 'details', 'ip_address', 'user_agent', 'timestamp']
+    
+    # Activities as their owner sees them, and with the user ID for admins and exports
+    USER_ACTIVITY_SERIALIZER = RowSerializer.for_model(
+        Activity, ['id', 'action', 'details', 'ip_address', 'user_agent', 'timestamp']
+    )
+    ACTIVITY_SERIALIZER = RowSerializer.for_model(Activity, EXPORT_FIELDS)
+    
     @staticmethod
     def log_activity(user_id: int, action: str, details: Optional[str] = None, 
-                    request: Optional[Request] = None) -> Dict[str, Any]:
-        """Log a user activity"""
+                    request: Optional[Request] = None, commit: bool = True) -> Dict[str, Any]:
+        """Log a user activity, commit=False leaves it for the caller's transaction"""
         activity_data = {
             'user_id': user_id,
             'action': action,
@@ -20,49 +37,85 @@ class ActivityService:
             activity_data['ip_address'] = request.remote_addr
             activity_data['user_agent'] = request.user_agent.string
         
+        # Hand the record to the background writer instead of inserting in the request
+        if current_app.config.get('ACTIVITY_LOG_MODE') == 'async':
+            activity_data['timestamp'] = datetime.utcnow()
+            if not activity_writer.enqueue(activity_data):
+                logger.warning('Activity queue full, dropped %s for user %s', action, user_id)
+                return {}
+            
+            return {
+                'user_id': user_id,
+                'action': action,
+                'timestamp': activity_data['timestamp'].isoformat()
+            }
+        
         try:
-            activity = ActivityRepository.create(activity_data)
+            activity = ActivityRepository.create(activity_data, commit=commit)
             return {
                 'id': activity.id,
-                'user_id': activity.user_id,
-                'action': activity.action,
+                'user_id': user_id,
+                'action': action,
                 'timestamp': activity.timestamp.isoformat()
             }
-        except Exception as e:
+        except Exception:
             # Log the error but don't fail the main operation
-            print(f"Error logging activity: {str(e)}")
+            logger.exception('Error logging activity')
             return {}
     
     @staticmethod
     def get_user_activities(user_id: int, page: int = 1, per_page: int = 20) -> List[Dict[str, Any]]:
         """Get activities for a user"""
         activities = ActivityRepository.get_by_user_id(user_id, page, per_page)
-        return [
-            {
-                'id': activity.id,
-                'action': activity.action,
-                'details': activity.details,
-                'ip_address': activity.ip_address,
-                'user_agent': activity.user_agent,
-                'timestamp': activity.timestamp.isoformat()
-            }
-            for activity in activities
-        ]
+        return ActivityService.USER_ACTIVITY_SERIALIZER.to_dicts(activities)
+    
+    @staticmethod
+    def get_user_activities_after(user_id: int, cursor: Optional[str] = None,
+                                  per_page: int = 20) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get activities for a user using cursor pagination"""
+        activities, next_cursor = ActivityRepository.get_by_user_id_after(user_id, cursor, per_page)
+        return ActivityService.USER_ACTIVITY_SERIALIZER.to_dicts(activities), next_cursor
     
     @staticmethod
     def get_all_activities(page: int = 1, per_page: int = 20) -> List[Dict[str, Any]]:
         """Get all activities"""
         activities = ActivityRepository.get_all(page, per_page)
-        return [
-            {
-                'id': activity.id,
-                'user_id': activity.user_id,
-                'action': activity.action,
-                'details': activity.details,
-                'ip_address': activity.ip_address,
-                'user_agent': activity.user_agent,
-                'timestamp': activity.timestamp.isoformat()
-            }
-            for activity in activities
-        ]
-
+        return ActivityService.ACTIVITY_SERIALIZER.to_dicts(activities)
+    
+    @staticmethod
+    def get_all_activities_after(cursor: Optional[str] = None,
+                                 per_page: int = 20) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get all activities using cursor pagination"""
+        activities, next_cursor = ActivityRepository.get_all_after(cursor, per_page)
+        return ActivityService.ACTIVITY_SERIALIZER.to_dicts(activities), next_cursor
+    
+    @staticmethod
+    def export_activities(fmt: str, user_id: Optional[int] = None, since: Optional[datetime] = None,
+                          until: Optional[datetime] = None,
+                          after: Optional[Tuple[datetime, int]] = None) -> Iterator[Union[str, bytes]]:
+        """Serialize matching activities as NDJSON or CSV, a chunk of rows at a time"""
+        batch_size = current_app.config.get('ACTIVITY_EXPORT_BATCH_SIZE', 1000)
+        rows = ActivityRepository.stream_for_export(user_id, since, until, after, batch_size)
+        
+        if fmt == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(ActivityService.EXPORT_FIELDS)
+            for count, row in enumerate(rows, start=1):
+                writer.writerow([row.id, row.user_id, row.action, row.details,
+                                 row.ip_address, row.user_agent, row.timestamp.isoformat()])
+                if count % batch_size == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+            return
+        
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= batch_size:
+                yield ActivityService.ACTIVITY_SERIALIZER.dump_lines(chunk)
+                chunk = []
+        if chunk:
+            yield ActivityService.ACTIVITY_SERIALIZER.dump_lines(chunk)
@@ -0,0 +1,73 @@
+from app.repositories.activity_stats_repository import ActivityStatsRepository
+from flask import current_app
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+class ActivityStatsService:
+    """Service maintaining and querying the daily activity rollups"""
+    
+    BUCKETS = ('day', 'week', 'month')
+    
+    @staticmethod
+    def catch_up(lag_seconds: int = None, chunk_ids: int = None) -> Dict[str, Any]:
+        """Fold every activity written since the last run into the rollups, one id range at a time"""
+        config = current_app.config
+        lag_seconds = config.get('ACTIVITY_STATS_LAG_SECONDS', 60) if lag_seconds is None else lag_seconds
+        chunk_ids = config.get('ACTIVITY_STATS_CHUNK_IDS', 50000) if chunk_ids is None else chunk_ids
+        per_user = config.get('ACTIVITY_STATS_PER_USER', False)
+        
+        # Ids are allocated before commit, so a recent id can become visible after a
+        # higher one; staying lag seconds behind lets those transactions finish first
+        cutoff = datetime.utcnow() - timedelta(seconds=lag_seconds)
+        last_id, upper_id = ActivityStatsRepository.get_pending_range(cutoff)
+        start_id = last_id
+        
+        chunks = 0
+        while upper_id is not None and last_id < upper_id:
+            chunk_end = min(last_id + chunk_ids, upper_id)
+            if not ActivityStatsRepository.fold(last_id, chunk_end, per_user):
+                return {'skipped': 'another rollup run is in progress', 'last_id': last_id}
+            last_id = chunk_end
+            chunks += 1
+        
+        return {'from_id': start_id, 'last_id': last_id, 'chunks': chunks}
+    
+    @staticmethod
+    def get_stats(bucket: str = 'day', since: Optional[date] = None, until: Optional[date] = None,
+                  actions: Optional[List[str]] = None, user_id: Optional[int] = None) -> Dict[str, Any]:
+        """Get activity counts per time bucket and action from the rollups"""
+        if bucket not in ActivityStatsService.BUCKETS:
+            raise ValueError(f"bucket must be one of {', '.join(ActivityStatsService.BUCKETS)}")
+        if user_id is not None and not current_app.config.get('ACTIVITY_STATS_PER_USER', False):
+            raise ValueError('Per-user statistics are not enabled')
+        
+        rows = ActivityStatsRepository.get_counts(since, until, actions, user_id or 0)
+        
+        # At most a row per day and action, so rolling days up here is cheap
+        series = {}
+        totals = {}
+        for day, action, count in rows:
+            start = ActivityStatsService._bucket_start(day, bucket)
+            counts = series.setdefault(start, {})
+            counts[action] = counts.get(action, 0) + count
+            totals[action] = totals.get(action, 0) + count
+        
+        state = ActivityStatsRepository.get_state()
+        return {
+            'bucket': bucket,
+            'series': [
+                {'start': start.isoformat(), 'counts': counts}
+                for start, counts in sorted(series.items())
+            ],
+            'totals': totals,
+            'last_activity_id': state.last_id if state else 0,
+            'updated_at': state.updated_at.isoformat() if state and state.updated_at else None
+        }
+    
+    @staticmethod
+    def _bucket_start(day: date, bucket: str) -> date:
+        if bucket == 'week':
+            return day - timedelta(days=day.weekday())
+        if bucket == 'month':
+            return day.replace(day=1)
+        return day
@@ -0,0 +1,156 @@
+from app.repositories.activity_repository import ActivityRepository
+from typing import Dict, Any, List, Optional
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class ActivityWriter:
+    """Background writer that batches activity records into multi-row INSERTs"""
+    
+    def __init__(self):
+        self.app = None
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._stats = {
+            'enqueued': 0,
+            'written': 0,
+            'dropped': 0,
+            'overflow': 0,
+            'failed': 0,
+            'flushes': 0
+        }
+    
+    def init_app(self, app) -> None:
+        """Bind the writer to an application and register the shutdown hook"""
+        self.app = app
+        self.max_size = app.config.get('ACTIVITY_QUEUE_SIZE', 10000)
+        self.batch_size = app.config.get('ACTIVITY_BATCH_SIZE', 500)
+        self.flush_interval = app.config.get('ACTIVITY_FLUSH_INTERVAL', 1.0)
+        self.enqueue_timeout = app.config.get('ACTIVITY_ENQUEUE_TIMEOUT', 0.05)
+        self.shutdown_timeout = app.config.get('ACTIVITY_SHUTDOWN_TIMEOUT', 10.0)
+        self._queue = queue.Queue(maxsize=self.max_size)
+        self._pid = os.getpid()
+        atexit.register(self.shutdown)
+    
+    def enqueue(self, activity_data: Dict[str, Any]) -> bool:
+        """Queue an activity for writing, returns False if it had to be dropped"""
+        self._ensure_started()
+        
+        try:
+            self._queue.put_nowait(activity_data)
+        except queue.Full:
+            # Queue is full: apply backpressure by blocking the caller briefly
+            self._count('overflow')
+            try:
+                self._queue.put(activity_data, timeout=self.enqueue_timeout)
+            except queue.Full:
+                self._count('dropped')
+                return False
+        
+        self._count('enqueued')
+        return True
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get writer counters and current queue depth"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['queued'] = self._queue.qsize() if self._queue is not None else 0
+        stats['running'] = self._thread is not None and self._thread.is_alive()
+        return stats
+    
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """Stop the writer thread after draining everything still queued"""
+        thread = self._thread
+        if thread is None or self._pid != os.getpid():
+            return
+        
+        self._stopping.set()
+        thread.join(timeout if timeout is not None else self.shutdown_timeout)
+        if thread.is_alive():
+            logger.warning('Activity writer did not drain in time, %d activities lost', self._queue.qsize())
+            return
+        
+        self._thread = None
+        self._stopping.clear()
+    
+    def _ensure_started(self) -> None:
+        """Start the writer thread, restarting it in forked worker processes"""
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked from the master: the parent's queue and thread are not ours
+                self._queue = queue.Queue(maxsize=self.max_size)
+                self._lock = threading.Lock()
+                self._stopping = threading.Event()
+                self._thread = None
+                self._pid = os.getpid()
+            
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name='activity-writer',
+                    daemon=True
+                )
+                self._thread.start()
+    
+    def _run(self) -> None:
+        """Writer loop: flush when the batch is full or the interval elapses"""
+        with self.app.app_context():
+            while True:
+                batch = self._collect()
+                if batch:
+                    self._flush(batch)
+                elif self._stopping.is_set():
+                    return
+    
+    def _collect(self) -> List[Dict[str, Any]]:
+        """Collect up to batch_size activities, waiting at most flush_interval"""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        
+        while len(batch) < self.batch_size:
+            try:
+                if self._stopping.is_set():
+                    # Draining: take whatever is left without waiting
+                    batch.append(self._queue.get_nowait())
+                    continue
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        
+        return batch
+    
+    def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        """Write one batch in a single transaction"""
+        from app import db
+        
+        try:
+            ActivityRepository.create_many(batch)
+            self._count('written', len(batch))
+        except Exception:
+            self._count('failed', len(batch))
+            logger.exception('Error writing a batch of %d activities', len(batch))
+        finally:
+            self._count('flushes')
+            db.session.remove()
+    
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += amount
+
+# Shared writer instance, bound to the app in create_app
+activity_writer = ActivityWriter()
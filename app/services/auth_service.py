@@ -1,7 +1,10 @@
 from app.repositories.user_repository import UserRepository
 from app.services.token_service import TokenService
 from app.services.activity_service import ActivityService
+from app.services.availability_service import AvailabilityService
+from app.services.password_service import HashingBusyError
 from app.utils.validators import validate_email, validate_password
+from sqlalchemy.exc import IntegrityError
 from typing import Dict, Any, Optional, Tuple
 from flask import request
 
@@ -19,10 +22,11 @@ class AuthService:
             return {'error': 'Password must be at least 8 characters and contain letters and numbers'}, 400
         
         # Check if user already exists
-        if UserRepository.get_by_email(user_data.get('email')):
+        # Names nobody has are answered by the Bloom filter without a query
+        if AvailabilityService.is_taken('email', user_data.get('email')):
             return {'error': 'Email already registered'}, 409
         
-        if UserRepository.get_by_username(user_data.get('username')):
+        if AvailabilityService.is_taken('username', user_data.get('username')):
             return {'error': 'Username already taken'}, 409
         
         # Create user
@@ -38,6 +42,11 @@ class AuthService:
             )
             
             return {'message': 'User registered successfully'}, 201
+        except HashingBusyError:
+            return {'error': 'Server busy, please try again shortly'}, 503
+        except IntegrityError:
+            # Taken by a user the checks above could not see yet
+            return {'error': 'Username or email already taken'}, 409
         except Exception as e:
             return {'error': str(e)}, 500
     
@@ -47,10 +56,8 @@ class AuthService:
         username = credentials.get('username')
         password = credentials.get('password')
         
-        # Find user by username or email
-        user = UserRepository.get_by_username(username)
-        if not user:
-            user = UserRepository.get_by_email(username)
+        # Find user by username or email in one indexed query
+        user = UserRepository.get_by_username_or_email(username)
         
         # Verify user and password
         if not user:
@@ -68,30 +75,37 @@ class AuthService:
         if not user.verify_password(password):
             return {'error': 'Invalid credentials'}, 401
         
-        # Update last login
-        UserRepository.update_last_login(user)
+        # Upgrade hashes made with old parameters, saved with the last login commit
+        if user.needs_rehash():
+            user.password = password
         
-        # Generate tokens
-        access_token = TokenService.generate_access_token(user.id, user.role)
-        refresh_token = TokenService.generate_refresh_token(user.id)
+        # Copy what the response needs now, the commit below expires the instance
+        user_info = {
+            'id': user.id,
+            'username': user.username,
+            'email': user.email,
+            'role': user.role
+        }
+        token_version = user.token_version
         
-        # Log activity
+        # Log activity in the same transaction as the last login update
         ActivityService.log_activity(
-            user_id=user.id,
+            user_id=user_info['id'],
             action='user_login',
             details='User logged in successfully',
-            request=request
+            request=request,
+            commit=False
         )
+        UserRepository.update_last_login(user)
+        
+        # Generate tokens
+        access_token = TokenService.generate_access_token(user_info['id'], user_info['role'], token_version)
+        refresh_token = TokenService.generate_refresh_token(user_info['id'])
         
         return {
             'access_token': access_token,
             'refresh_token': refresh_token,
-            'user': {
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'role': user.role
-            }
+            'user': user_info
         }, 200
     
     @staticmethod
@@ -135,7 +149,7 @@ class AuthService:
                 return {'error': 'Your account has been deactivated. Please contact support for assistance.'}, 403
             
             # Generate new access token
-            new_access_token = TokenService.generate_access_token(user.id, user.role)
+            new_access_token = TokenService.generate_access_token(user.id, user.role, user.token_version)
             
             return {'access_token': new_access_token}, 200
         except Exception as e:
@@ -1,5 +1,7 @@
+from app.services.principal_service import PrincipalService
 from app.repositories.user_repository import UserRepository
 from typing import Dict, Any, List, Optional
+import zlib
 
 class AuthorizationService:
     """Service for authorization operations"""
@@ -26,6 +28,48 @@ class AuthorizationService:
         ]
     }
     
+    # Filled in by compile_permissions(): one bit per permission, one mask per role
+    PERMISSION_BITS: Dict[str, int] = {}
+    ROLE_MASKS: Dict[str, int] = {}
+    # Fingerprint of the bit layout, embedded in tokens so stale masks are ignored
+    PERMISSIONS_VERSION: Optional[int] = None
+    
+    @staticmethod
+    def compile_permissions() -> None:
+        """Compile PERMISSIONS into permission bits and per-role bitmasks"""
+        bits = {}
+        for permissions in AuthorizationService.PERMISSIONS.values():
+            for permission in permissions:
+                if permission not in bits:
+                    bits[permission] = 1 << len(bits)
+        
+        role_masks = {}
+        for role, permissions in AuthorizationService.PERMISSIONS.items():
+            mask = 0
+            for permission in permissions:
+                mask |= bits[permission]
+            role_masks[role] = mask
+        
+        layout = ','.join(f'{permission}={bit}' for permission, bit in sorted(bits.items()))
+        AuthorizationService.PERMISSION_BITS = bits
+        AuthorizationService.ROLE_MASKS = role_masks
+        AuthorizationService.PERMISSIONS_VERSION = zlib.crc32(layout.encode('utf-8'))
+    
+    @staticmethod
+    def get_role_mask(role: str) -> int:
+        """Get the permission bitmask for a role"""
+        if AuthorizationService.PERMISSIONS_VERSION is None:
+            AuthorizationService.compile_permissions()
+        return AuthorizationService.ROLE_MASKS.get(role, 0)
+    
+    @staticmethod
+    def mask_has_permission(mask: int, permission: str) -> bool:
+        """Check a permission against a bitmask with a single bit test"""
+        if AuthorizationService.PERMISSIONS_VERSION is None:
+            AuthorizationService.compile_permissions()
+        bit = AuthorizationService.PERMISSION_BITS.get(permission, 0)
+        return bit != 0 and mask & bit == bit
+    
     @staticmethod
     def get_permissions(role: str) -> List[str]:
         """Get permissions for a role"""
@@ -34,12 +78,41 @@ class AuthorizationService:
     @staticmethod
     def has_permission(user_id: int, permission: str) -> bool:
         """Check if user has a specific permission"""
-        user = UserRepository.get_by_id(user_id)
+        user = PrincipalService.get(user_id)
         if not user:
             return False
         
-        user_permissions = AuthorizationService.get_permissions(user.role)
-        return permission in user_permissions
+        role_mask = AuthorizationService.get_role_mask(user.role)
+        return AuthorizationService.mask_has_permission(role_mask, permission)
+    
+    @staticmethod
+    def get_token_claims(role: str, token_version: int) -> Dict[str, Any]:
+        """Get the authorization claims to embed in an access token"""
+        return {
+            'role': role,
+            'perms': AuthorizationService.get_role_mask(role),
+            'pv': AuthorizationService.PERMISSIONS_VERSION,
+            'tv': token_version
+        }
+    
+    @staticmethod
+    def authorize_claims(claims: Dict[str, Any], permission: Optional[str] = None,
+                         role: Optional[str] = None) -> Optional[bool]:
+        """Authorize from signed token claims, None if they predate the permission layout"""
+        if 'perms' not in claims or claims.get('pv') != AuthorizationService.PERMISSIONS_VERSION:
+            return None
+        
+        # Role changes, deactivation and deletion bump the user's token version
+        if claims.get('tv') != UserRepository.get_token_version(claims.get('sub')):
+            return False
+        
+        if role is not None and claims.get('role') != role:
+            return False
+        
+        if permission is not None:
+            return AuthorizationService.mask_has_permission(claims['perms'], permission)
+        
+        return True
     
     @staticmethod
     def can_access_resource(user_id: int, resource_owner_id: int, permission: str) -> bool:
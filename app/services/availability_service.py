@@ -0,0 +1,36 @@
+from app.repositories.user_repository import UserRepository
+from app.services.identity_filter import identity_filter
+from app.utils.validators import validate_email
+from typing import Any, Dict, Optional, Tuple
+
+class AvailabilityService:
+    """Service answering whether a username or email is in use, from the Bloom filter when it can"""
+    
+    @staticmethod
+    def is_taken(kind: str, value: str) -> bool:
+        """Check a username ('username') or email ('email'), skipping the database on a filter miss"""
+        if not identity_filter.might_exist(kind, value):
+            return False
+        
+        if kind == 'username':
+            return UserRepository.get_by_username(value) is not None
+        return UserRepository.get_by_email(value) is not None
+    
+    @staticmethod
+    def check(username: Optional[str] = None, email: Optional[str] = None) -> Tuple[Dict[str, Any], int]:
+        """Report the availability of a username and/or an email for the register form"""
+        if not username and not email:
+            return {'error': 'Pass a username, an email or both'}, 400
+        
+        result = {}
+        if username:
+            result['username'] = {
+                'value': username,
+                'available': not AvailabilityService.is_taken('username', username)
+            }
+        if email:
+            if not validate_email(email):
+                result['email'] = {'value': email, 'available': False, 'error': 'Invalid email format'}
+            else:
+                result['email'] = {'value': email, 'available': not AvailabilityService.is_taken('email', email)}
+        return result, 200
@@ -1,36 +1,188 @@
 from app import cache
-from typing import Any, Optional
+from app.services.local_cache import local_cache
+from app.services.metrics_service import MetricsService
+from flask import current_app
+from typing import Any, Callable, Dict, Iterable, Optional
 from datetime import timedelta
+import threading
+import time
+import uuid
 
 class CacheService:
-    """Service for cache operations"""
+    """Service for cache operations, through the in-process tier when it is enabled"""
+    
+    # Cached in place of a loader's None for CACHE_NEGATIVE_TTL seconds, so
+    # lookups of missing rows (404s, deleted users) are not reloaded every time
+    MISSING = '__cache_missing__'
+    
+    # key -> event set when this process's load of the key finishes
+    _loading: Dict[str, threading.Event] = {}
+    _loading_lock = threading.Lock()
     
     @staticmethod
     def set(key: str, value: Any, timeout: Optional[int] = None) -> bool:
         """Set a cache value"""
-        return cache.set(key, value, timeout=timeout)
+        result = cache.set(key, value, timeout=timeout)
+        local_cache.set(key, value, timeout)
+        return result
     
     @staticmethod
     def get(key: str, default: Any = None) -> Any:
         """Get a cache value"""
-        value = cache.get(key)
+        found, value = local_cache.get(key)
+        if not found:
+            epoch = local_cache.epoch()
+            value = cache.get(key)
+            MetricsService.record_cache_layer('shared', value is not None)
+            if value is not None:
+                local_cache.fill(key, value, epoch)
+        
+        MetricsService.record_cache(key, value is not None)
         return value if value is not None else default
     
+    @staticmethod
+    def get_or_load(key: str, loader: Callable[[], Any], timeout: Optional[int] = None) -> Any:
+        """Get a cache value, running loader once on a miss however many requests miss together
+        
+        Concurrent misses in this process wait for the first one's load; other
+        processes wait up to CACHE_LOAD_WAIT for the one holding the load lock,
+        or until it lets go of the lock. A loader result of None is cached as
+        MISSING for CACHE_NEGATIVE_TTL seconds and returned as None.
+        """
+        value = CacheService.get(key)
+        if value is not None:
+            return None if value == CacheService.MISSING else value
+        
+        wait = current_app.config.get('CACHE_LOAD_WAIT', 2.0)
+        with CacheService._loading_lock:
+            loading = CacheService._loading.get(key)
+            if loading is None:
+                CacheService._loading[key] = threading.Event()
+        
+        if loading is not None:
+            loading.wait(wait)
+            value = CacheService.get(key)
+            if value is not None:
+                MetricsService.record_cache_load('coalesced')
+                return None if value == CacheService.MISSING else value
+            # The load failed or the value is already gone again
+            return loader()
+        
+        lock_key = f'lock:{key}'
+        locked = False
+        try:
+            locked = cache.add(lock_key, 1, timeout=max(1, int(wait * 2)))
+            if not locked:
+                value = CacheService._wait_for(key, lock_key, wait)
+                if value is not None:
+                    MetricsService.record_cache_load('coalesced')
+                    return None if value == CacheService.MISSING else value
+            
+            value = loader()
+            MetricsService.record_cache_load('loaded')
+            if value is not None:
+                CacheService.set(key, value, timeout=timeout)
+            else:
+                negative_ttl = current_app.config.get('CACHE_NEGATIVE_TTL', 5)
+                if negative_ttl:
+                    CacheService.set(key, CacheService.MISSING, timeout=negative_ttl)
+            return value
+        finally:
+            if locked:
+                cache.delete(lock_key)
+            with CacheService._loading_lock:
+                CacheService._loading.pop(key).set()
+    
+    @staticmethod
+    def _wait_for(key: str, lock_key: str, wait: float) -> Any:
+        """Poll the shared cache while another process loads a key, until it lets go of the lock"""
+        deadline = time.monotonic() + wait
+        while time.monotonic() < deadline:
+            time.sleep(0.01)
+            epoch = local_cache.epoch()
+            value, locked = cache.get_many(key, lock_key)
+            if value is not None:
+                local_cache.fill(key, value, epoch)
+                return value
+            if locked is None:
+                # The holder finished without caching anything, or died
+                return None
+        return None
+    
     @staticmethod
     def delete(key: str) -> bool:
         """Delete a cache value"""
-        return cache.delete(key)
+        result = cache.delete(key)
+        local_cache.invalidate([key])
+        return result
+    
+    @staticmethod
+    def delete_many(*keys: str) -> bool:
+        """Delete several cache values"""
+        result = cache.delete_many(*keys)
+        local_cache.invalidate(keys)
+        return result
     
     @staticmethod
     def clear() -> bool:
         """Clear all cache"""
-        return cache.clear()
+        result = cache.clear()
+        local_cache.clear()
+        return result
     
     @staticmethod
     def has(key: str) -> bool:
         """Check if cache has a key"""
         return cache.has(key)
     
+    @staticmethod
+    def tagged_key(key: str, tags: Iterable[str]) -> str:
+        """Suffix a key with the current generation of each tag
+        
+        Build the key before reading the data: a bump in between then leaves
+        the value under the old, unreachable generation instead of a stale one.
+        """
+        tag_keys = [CacheService._tag_key(tag) for tag in tags]
+        generations = []
+        missing = []
+        for tag_key in tag_keys:
+            found, generation = local_cache.get(tag_key)
+            generations.append(generation if found else None)
+            if not found:
+                missing.append(tag_key)
+        
+        if missing:
+            epoch = local_cache.epoch()
+            fetched = dict(zip(missing, cache.get_many(*missing)))
+            for index, tag_key in enumerate(tag_keys):
+                if tag_key not in fetched:
+                    continue
+                generation = fetched[tag_key]
+                if generation is None:
+                    # New or evicted tag: start a generation no earlier entry used
+                    cache.add(tag_key, CacheService._new_generation(), timeout=0)
+                    generation = cache.get(tag_key)
+                local_cache.fill(tag_key, generation, epoch)
+                generations[index] = generation
+        
+        return f"{key}@{'.'.join(str(generation) for generation in generations)}"
+    
+    @staticmethod
+    def bump_tags(*tags: str) -> None:
+        """Invalidate every entry cached under any of the tags"""
+        if tags:
+            cache.set_many({CacheService._tag_key(tag): CacheService._new_generation() for tag in tags}, timeout=0)
+            local_cache.invalidate([CacheService._tag_key(tag) for tag in tags])
+    
+    @staticmethod
+    def _tag_key(tag: str) -> str:
+        return f'tag:{tag}'
+    
+    @staticmethod
+    def _new_generation() -> str:
+        # Random rather than a counter, so concurrent bumps never reuse a generation
+        return uuid.uuid4().hex[:12]
+    
     @staticmethod
     def memoize(timeout: Optional[int] = None):
         """Decorator to memoize a function"""
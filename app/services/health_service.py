@@ -0,0 +1,125 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+from flask import current_app
+from sqlalchemy import text
+from app import db, cache
+from typing import Any, Callable, Dict, Tuple
+import os
+import threading
+import time
+
+class HealthService:
+    """Service running readiness probes against the app's dependencies"""
+    
+    _executor = None
+    _executor_pid = None
+    _lock = threading.Lock()
+    _running: Dict[str, Any] = {}
+    _result = None
+    _result_expires = 0.0
+    
+    @staticmethod
+    def check_ready() -> Tuple[Dict[str, Any], int]:
+        """Probe every dependency, reusing a recent result if there is one"""
+        ttl = current_app.config.get('HEALTH_CACHE_TTL', 2.0)
+        
+        # One caller probes while the others wait and share its result
+        with HealthService._lock:
+            now = time.monotonic()
+            if HealthService._result is not None and now < HealthService._result_expires:
+                return HealthService._result
+            
+            checks = HealthService._run_probes(HealthService._probes())
+            healthy = all(check['status'] == 'ok' for check in checks.values())
+            result = ({'status': 'ready' if healthy else 'unavailable', 'checks': checks}, 200 if healthy else 503)
+            
+            HealthService._result = result
+            HealthService._result_expires = time.monotonic() + ttl
+            return result
+    
+    @staticmethod
+    def _probes() -> Dict[str, Callable[[], None]]:
+        """Collect the probes that apply to the current configuration"""
+        app = current_app._get_current_object()
+        probes = {'database': HealthService._engine_probe(db.engine)}
+        
+        redis_cache = getattr(cache.cache, '_write_client', None)
+        if redis_cache is not None:
+            probes['cache'] = redis_cache.ping
+        
+        session_redis = getattr(app.session_interface, 'redis', None)
+        if session_redis is not None:
+            probes['session'] = session_redis.ping
+        
+        if app.config.get('HEALTH_CHECK_RAW_DB') and not app.config.get('DB_POOL_USE_ENGINE'):
+            probes['raw_database'] = HealthService._raw_db_probe(app)
+        
+        return probes
+    
+    @staticmethod
+    def _engine_probe(engine) -> Callable[[], None]:
+        def probe():
+            with engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+        return probe
+    
+    @staticmethod
+    def _raw_db_probe(app) -> Callable[[], None]:
+        def probe():
+            from database.db import get_db_connection
+            with app.app_context():
+                connection = get_db_connection()
+                try:
+                    with connection.cursor() as cursor:
+                        cursor.execute('SELECT 1')
+                finally:
+                    connection.close()
+        return probe
+    
+    @staticmethod
+    def _run_probes(probes: Dict[str, Callable[[], None]]) -> Dict[str, Dict[str, Any]]:
+        """Run probes in parallel, failing any that outlive the probe timeout"""
+        timeout = current_app.config.get('HEALTH_PROBE_TIMEOUT', 1.0)
+        executor = HealthService._get_executor()
+        checks = {}
+        futures = {}
+        
+        for name, probe in probes.items():
+            previous = HealthService._running.get(name)
+            if previous is not None and not previous.done():
+                # A hung probe keeps its thread; do not stack another one on top
+                checks[name] = {'status': 'error', 'error': 'previous probe still running'}
+                continue
+            futures[name] = HealthService._running[name] = executor.submit(HealthService._timed, probe)
+        
+        wait(futures.values(), timeout=timeout)
+        
+        for name, future in futures.items():
+            if not future.done():
+                checks[name] = {'status': 'error', 'error': f'timed out after {timeout}s'}
+                continue
+            
+            latency, error = future.result()
+            if error is None:
+                checks[name] = {'status': 'ok', 'latency_ms': round(latency * 1000, 2)}
+            else:
+                current_app.logger.warning(f"Readiness probe {name} failed: {error}")
+                checks[name] = {'status': 'error', 'error': type(error).__name__}
+        
+        return checks
+    
+    @staticmethod
+    def _timed(probe: Callable[[], None]) -> Tuple[float, Exception]:
+        started = time.perf_counter()
+        try:
+            probe()
+            return time.perf_counter() - started, None
+        except Exception as e:
+            return time.perf_counter() - started, e
+    
+    @staticmethod
+    def _get_executor() -> ThreadPoolExecutor:
+        if HealthService._executor is None or HealthService._executor_pid != os.getpid():
+            HealthService._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='health-probe')
+            HealthService._executor_pid = os.getpid()
+            HealthService._running = {}
+        return HealthService._executor
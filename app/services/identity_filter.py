@@ -0,0 +1,149 @@
+from app import db
+from app.models.user import User
+from app.services.local_cache import local_cache
+from app.utils.bloom import BloomFilter
+from sqlalchemy import func, select
+from typing import Iterable, List, Optional, Tuple
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class IdentityFilter:
+    """Per-process Bloom filter of every username and email in use, normalized
+    
+    Rebuilt from the users table every BLOOM_REBUILD_INTERVAL seconds in a
+    background thread and added to on every create or rename. Additions are
+    broadcast over the cache invalidation channel to every other process;
+    without that bus (or while it reconnects) other workers' users only show
+    up at the next rebuild. A miss therefore means the name is very likely
+    free: inserts still rely on the unique indexes.
+    """
+    
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self._filter: Optional[BloomFilter] = None
+        self._built_at = 0.0
+        self._building = False
+        self._pending: List[str] = []
+        self._lock = threading.Lock()
+        self._pid = None
+    
+    def init_app(self, app) -> None:
+        """Bind to an application; the first lookup starts the initial build"""
+        self.app = app
+        self.enabled = app.config.get('BLOOM_ENABLED', True)
+        self.error_rate = app.config.get('BLOOM_ERROR_RATE', 0.01)
+        self.rebuild_interval = app.config.get('BLOOM_REBUILD_INTERVAL', 600)
+        self._pid = os.getpid()
+        local_cache.add_listener('identities', self._add_keys, on_resubscribe=self._expire)
+    
+    @staticmethod
+    def normalize(kind: str, value: str) -> str:
+        """Key of a username ('username') or email ('email') in the filter"""
+        return f"{kind}:{value.strip().lower()}"
+    
+    def might_exist(self, kind: str, value: str) -> bool:
+        """False when no user has this username or email, True when one probably does"""
+        if not self.enabled or not value:
+            return True
+        local_cache.ensure_subscribed()
+        self._maybe_rebuild()
+        
+        bloom = self._filter
+        # Not built yet: every lookup has to go to the database
+        if bloom is None:
+            return True
+        return IdentityFilter.normalize(kind, value) in bloom
+    
+    def add(self, identities: Iterable[Tuple[str, str]]) -> None:
+        """Record (kind, value) pairs that are now in use"""
+        if not self.enabled:
+            return
+        
+        keys = [IdentityFilter.normalize(kind, value) for kind, value in identities if value]
+        if keys:
+            self._add_keys(keys)
+            local_cache.broadcast('identities', keys)
+    
+    def _add_keys(self, keys: List[str]) -> None:
+        with self._lock:
+            bloom = self._filter
+            if self._building:
+                # The rebuild's SELECT may have missed these, replay them into the new filter
+                self._pending.extend(keys)
+        if bloom is not None:
+            for key in keys:
+                bloom.add(key)
+    
+    def rebuild(self) -> int:
+        """Build a new filter from the users table and swap it in, returns the user count"""
+        table = User.__table__
+        with db.engine.connect() as connection:
+            count = connection.execute(select(func.count()).select_from(table)).scalar()
+            # Headroom for the users created before the next rebuild
+            bloom = BloomFilter(capacity=int(count * 2 * 1.25) + 1000, error_rate=self.error_rate)
+            rows = connection.execution_options(stream_results=True, yield_per=10000).execute(
+                select(table.c.username, table.c.email)
+            )
+            for username, email in rows:
+                bloom.add(IdentityFilter.normalize('username', username))
+                bloom.add(IdentityFilter.normalize('email', email))
+        
+        with self._lock:
+            for key in self._pending:
+                bloom.add(key)
+            self._pending = []
+            self._filter = bloom
+            self._built_at = time.monotonic()
+        return count
+    
+    def stats(self) -> dict:
+        """Get the size and age of the current filter"""
+        bloom = self._filter
+        return {
+            'enabled': self.enabled,
+            'built': bloom is not None,
+            'items': len(bloom) if bloom is not None else 0,
+            'bytes': bloom.nbytes if bloom is not None else 0,
+            'age': time.monotonic() - self._built_at if bloom is not None else None
+        }
+    
+    def _expire(self) -> None:
+        """Rebuild at the next lookup: broadcasts may have been missed"""
+        with self._lock:
+            self._built_at = 0.0
+    
+    def _maybe_rebuild(self) -> None:
+        if self._filter is not None and time.monotonic() - self._built_at < self.rebuild_interval:
+            return
+        
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked: the parent's rebuild thread does not exist here
+                self._building = False
+                self._pending = []
+                self._pid = os.getpid()
+            if self._building:
+                return
+            self._building = True
+        
+        threading.Thread(target=self._run_rebuild, name='identity-filter', daemon=True).start()
+    
+    def _run_rebuild(self) -> None:
+        try:
+            with self.app.app_context():
+                self.rebuild()
+        except Exception as e:
+            logger.error(f'Identity filter rebuild failed: {str(e)}')
+            # Retry at the next interval rather than on every lookup
+            with self._lock:
+                self._built_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._building = False
+
+identity_filter = IdentityFilter()
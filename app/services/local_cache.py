@@ -0,0 +1,247 @@
+from app.services.metrics_service import MetricsService
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Cache backends that are private to the process; anything else is shared
+# between workers and needs invalidation broadcasts to put a local tier in front
+PROCESS_LOCAL_BACKENDS = ('SimpleCache', 'NullCache', 'null', 'simple')
+
+class LocalCache:
+    """Bounded, size-aware in-process LRU kept coherent across processes over Redis pub/sub
+    
+    Values are stored pickled, like in Redis, so callers never share (and
+    mutate) a cached object, and entry sizes are exact.
+    """
+    
+    def __init__(self):
+        self.enabled = False
+        self.max_entries = 0
+        self.max_bytes = 0
+        self.max_ttl = 0.0
+        self._entries: 'OrderedDict[str, Tuple[bytes, float]]' = OrderedDict()
+        self._bytes = 0
+        # Bumped by every invalidation, local or received: a fill started
+        # before one may hold a value read before the write, so it is dropped
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self._redis = None
+        self._channel = None
+        self._origin = uuid.uuid4().hex
+        self._thread = None
+        self._pid = None
+        # Other kinds of broadcast sharing the channel: kind -> (handler, on_resubscribe)
+        self._listeners: Dict[str, Tuple[Callable[[Any], None], Optional[Callable[[], None]]]] = {}
+    
+    def init_app(self, app, redis_client=None) -> None:
+        """Configure from the app, pass redis_client to use a stand-in for the invalidation bus"""
+        config = app.config
+        self.max_entries = config.get('CACHE_LOCAL_MAX_ENTRIES', 10000)
+        self.max_bytes = config.get('CACHE_LOCAL_MAX_BYTES', 32 * 1024 * 1024)
+        self.max_ttl = config.get('CACHE_LOCAL_TTL', 30)
+        self._channel = config.get('CACHE_INVALIDATION_CHANNEL', 'cache-invalidation')
+        self.enabled = config.get('CACHE_LOCAL_ENABLED', False)
+        
+        if redis_client is None and config.get('CACHE_INVALIDATION_REDIS_URL'):
+            import redis
+            redis_client = redis.from_url(config['CACHE_INVALIDATION_REDIS_URL'])
+        self._redis = redis_client
+        
+        if self.enabled and self._redis is None and config.get('CACHE_TYPE') not in PROCESS_LOCAL_BACKENDS:
+            # Without broadcasts other workers would keep serving overwritten values
+            logger.warning('CACHE_LOCAL_ENABLED needs CACHE_INVALIDATION_REDIS_URL with a shared cache, '
+                           'in-process cache disabled')
+            self.enabled = False
+        
+        self._pid = os.getpid()
+    
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Look a key up, returns (found, value)"""
+        if not self.enabled:
+            return False, None
+        self.ensure_subscribed()
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= time.monotonic():
+                self._remove(key)
+                MetricsService.record_cache_eviction('expired')
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        
+        MetricsService.record_cache_layer('local', entry is not None)
+        if entry is None:
+            return False, None
+        return True, pickle.loads(entry[0])
+    
+    def epoch(self) -> int:
+        """Invalidation counter to pass to fill() for a value about to be read elsewhere"""
+        return self._epoch
+    
+    def fill(self, key: str, value: Any, epoch: int, timeout: Optional[float] = None) -> None:
+        """Keep a value read from the shared cache, unless an invalidation arrived since epoch"""
+        if not self.enabled:
+            return
+        
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        size = len(payload) + len(key)
+        # One entry may not crowd out most of the cache
+        if size > self.max_bytes // 8:
+            return
+        
+        ttl = self.max_ttl if not timeout else min(timeout, self.max_ttl)
+        with self._lock:
+            if self._epoch != epoch:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (payload, time.monotonic() + ttl)
+            self._bytes += size
+            
+            evicted = 0
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                evicted += 1
+            entries, size = len(self._entries), self._bytes
+        
+        MetricsService.record_cache_eviction('capacity', evicted)
+        MetricsService.set_local_cache_size(entries, size)
+    
+    def set(self, key: str, value: Any, timeout: Optional[float] = None) -> None:
+        """Keep a value just written to the shared cache and drop other processes' copies"""
+        if not self.enabled:
+            return
+        self.invalidate([key])
+        self.fill(key, value, self._epoch, timeout)
+    
+    def invalidate(self, keys: Iterable[str], broadcast: bool = True) -> None:
+        """Drop keys here and, with broadcast, in every other process"""
+        keys = list(keys)
+        if not self.enabled or not keys:
+            return
+        
+        with self._lock:
+            self._epoch += 1
+            dropped = 0
+            for key in keys:
+                if key in self._entries:
+                    self._remove(key)
+                    dropped += 1
+            entries, size = len(self._entries), self._bytes
+        
+        MetricsService.record_cache_eviction('invalidated', dropped)
+        MetricsService.set_local_cache_size(entries, size)
+        if broadcast:
+            self._publish({'keys': keys})
+    
+    def clear(self, broadcast: bool = True) -> None:
+        """Drop every entry here and, with broadcast, in every other process"""
+        if not self.enabled:
+            return
+        
+        with self._lock:
+            self._epoch += 1
+            dropped = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+        
+        MetricsService.record_cache_eviction('invalidated', dropped)
+        MetricsService.set_local_cache_size(0, 0)
+        if broadcast:
+            self._publish({'clear': True})
+    
+    def add_listener(self, kind: str, handler: Callable[[Any], None],
+                     on_resubscribe: Optional[Callable[[], None]] = None) -> None:
+        """Receive broadcasts of kind from other processes, and learn when some may have been missed"""
+        self._listeners[kind] = (handler, on_resubscribe)
+    
+    def broadcast(self, kind: str, payload: Any) -> bool:
+        """Send a JSON payload to the kind's listeners in every other process, False without a bus"""
+        if self._redis is None:
+            return False
+        self.ensure_subscribed()
+        self._publish({'kind': kind, 'payload': payload})
+        return True
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get the current size of this process's cache"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'subscribed': self._thread is not None and self._thread.is_alive()
+            }
+    
+    def _remove(self, key: str) -> None:
+        payload, _ = self._entries.pop(key)
+        self._bytes -= len(payload) + len(key)
+    
+    def _publish(self, message: Dict[str, Any]) -> None:
+        if self._redis is None:
+            return
+        message['origin'] = self._origin
+        try:
+            self._redis.publish(self._channel, json.dumps(message))
+        except Exception as e:
+            # Other processes keep their copies until the local TTL runs out
+            logger.error(f'Cache invalidation broadcast failed: {str(e)}')
+    
+    def ensure_subscribed(self) -> None:
+        """Start the subscriber thread, again in forked worker processes"""
+        if self._redis is None or (self._thread is not None and self._pid == os.getpid()):
+            return
+        
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked: the parent's entries were never invalidated for us
+                self._entries.clear()
+                self._bytes = 0
+                self._origin = uuid.uuid4().hex
+                self._thread = None
+                self._pid = os.getpid()
+            
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._listen, name='cache-invalidation', daemon=True)
+                self._thread.start()
+    
+    def _listen(self) -> None:
+        """Apply invalidations from other processes, resubscribing after connection loss"""
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._channel)
+                # Broadcasts sent while disconnected are lost, start over clean
+                self.clear(broadcast=False)
+                for _, on_resubscribe in list(self._listeners.values()):
+                    if on_resubscribe is not None:
+                        on_resubscribe()
+                
+                for message in pubsub.listen():
+                    if message.get('type') != 'message':
+                        continue
+                    data = json.loads(message['data'])
+                    if data.get('origin') == self._origin:
+                        continue
+                    if data.get('kind'):
+                        listener = self._listeners.get(data['kind'])
+                        if listener is not None:
+                            listener[0](data.get('payload'))
+                    elif data.get('clear'):
+                        self.clear(broadcast=False)
+                    else:
+                        self.invalidate(data.get('keys', []), broadcast=False)
+            except Exception as e:
+                logger.error(f'Cache invalidation subscriber error: {str(e)}')
+                time.sleep(1.0)
+
+local_cache = LocalCache()
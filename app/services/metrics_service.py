@@ -0,0 +1,202 @@
+from flask import g, request
+from app import db
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, REGISTRY,
+    CONTENT_TYPE_LATEST, generate_latest, multiprocess
+)
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from typing import Tuple
+import hmac
+import logging
+import os
+import time
+
+# In multiprocess mode (PROMETHEUS_MULTIPROC_DIR set before import) every
+# worker writes its samples to mmap files and /metrics sums them on scrape.
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency',
+    ['blueprint', 'endpoint', 'method'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+REQUEST_COUNT = Counter(
+    'http_requests_total', 'Requests by status code',
+    ['blueprint', 'endpoint', 'method', 'status']
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'http_requests_in_progress', 'Requests being handled',
+    ['blueprint'], multiprocess_mode='livesum'
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    'db_pool_checked_out', 'Connections checked out of the SQLAlchemy pool',
+    multiprocess_mode='livesum'
+)
+DB_POOL_OVERFLOW = Gauge(
+    'db_pool_overflow', 'Connections open beyond the SQLAlchemy pool size',
+    multiprocess_mode='livesum'
+)
+DB_POOL_SIZE = Gauge(
+    'db_pool_size', 'Configured SQLAlchemy pool size',
+    multiprocess_mode='livesum'
+)
+DB_POOL_WAIT = Histogram(
+    'db_pool_wait_seconds', 'Time spent waiting for a pooled connection',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests_total', 'Cache lookups by key space and result',
+    ['keyspace', 'result']
+)
+CACHE_LAYER_REQUESTS = Counter(
+    'cache_layer_requests_total', 'Cache lookups by layer (local, shared) and result',
+    ['layer', 'result']
+)
+CACHE_LOCAL_EVICTIONS = Counter(
+    'cache_local_evictions_total', 'Entries dropped from the in-process cache by reason',
+    ['reason']
+)
+CACHE_LOCAL_ENTRIES = Gauge(
+    'cache_local_entries', 'Entries held by the in-process caches',
+    multiprocess_mode='livesum'
+)
+CACHE_LOCAL_BYTES = Gauge(
+    'cache_local_bytes', 'Pickled bytes held by the in-process caches',
+    multiprocess_mode='livesum'
+)
+CACHE_LOADS = Counter(
+    'cache_loads_total', 'get_or_load misses that ran the loader or waited for another load',
+    ['result']
+)
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+    
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - started)
+
+# SQLAlchemy names pool loggers after the pool class's module, which puts this
+# one under the Flask app logger; keep per-checkout debug lines out of it
+logging.getLogger(f'{__name__}.TimedQueuePool').setLevel(logging.WARNING)
+
+class MetricsService:
+    """Service collecting request, pool and cache metrics for Prometheus"""
+    
+    @staticmethod
+    def configure_engine(app) -> None:
+        """Use the timed pool for the app's engine, call before db.init_app"""
+        if not app.config.get('METRICS_ENABLED', True):
+            return
+        
+        uri = app.config.get('SQLALCHEMY_DATABASE_URI')
+        if not uri:
+            return
+        
+        url = make_url(uri)
+        # Only swap in for dialects that pool with QueuePool (not SQLite :memory:)
+        if url.get_dialect().get_pool_class(url) is QueuePool:
+            options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+            options.setdefault('poolclass', TimedQueuePool)
+    
+    @staticmethod
+    def init_app(app) -> None:
+        """Register request hooks and pool listeners"""
+        if not app.config.get('METRICS_ENABLED', True):
+            return
+        
+        app.before_request(MetricsService._start_request)
+        app.after_request(MetricsService._finish_request)
+        app.teardown_request(MetricsService._teardown_request)
+        
+        with app.app_context():
+            MetricsService._watch_pool(db.engine)
+    
+    @staticmethod
+    def is_scrape_allowed(app) -> bool:
+        """Check the scraper's bearer token, or allow tokenless scrapes in debug and testing"""
+        token = app.config.get('METRICS_TOKEN')
+        if not token:
+            return app.debug or app.testing
+        
+        scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+        return scheme.lower() == 'bearer' and hmac.compare_digest(credentials.encode('utf-8'), token.encode('utf-8'))
+    
+    @staticmethod
+    def render() -> Tuple[bytes, str]:
+        """Render all metrics in the Prometheus text format"""
+        if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    
+    @staticmethod
+    def record_cache(key: str, hit: bool) -> None:
+        """Count a cache lookup under the first segment of its key"""
+        CACHE_REQUESTS.labels(key.split(':', 1)[0], 'hit' if hit else 'miss').inc()
+    
+    @staticmethod
+    def record_cache_layer(layer: str, hit: bool) -> None:
+        """Count a lookup in one cache layer"""
+        CACHE_LAYER_REQUESTS.labels(layer, 'hit' if hit else 'miss').inc()
+    
+    @staticmethod
+    def record_cache_eviction(reason: str, count: int = 1) -> None:
+        """Count entries dropped from the in-process cache"""
+        if count:
+            CACHE_LOCAL_EVICTIONS.labels(reason).inc(count)
+    
+    @staticmethod
+    def set_local_cache_size(entries: int, size: int) -> None:
+        """Report the current size of this process's in-process cache"""
+        CACHE_LOCAL_ENTRIES.set(entries)
+        CACHE_LOCAL_BYTES.set(size)
+    
+    @staticmethod
+    def record_cache_load(result: str) -> None:
+        """Count a get_or_load fill: 'loaded' or 'coalesced' onto another load"""
+        CACHE_LOADS.labels(result).inc()
+    
+    @staticmethod
+    def _watch_pool(engine) -> None:
+        # Read engine.pool on each event: dispose() replaces the pool object
+        def update(*args):
+            pool = engine.pool
+            DB_POOL_CHECKED_OUT.set(pool.checkedout())
+            if isinstance(pool, QueuePool):
+                DB_POOL_SIZE.set(pool.size())
+                DB_POOL_OVERFLOW.set(max(pool.overflow(), 0))
+        
+        event.listen(engine, 'checkout', update)
+        event.listen(engine, 'checkin', update)
+    
+    @staticmethod
+    def _start_request() -> None:
+        blueprint = request.blueprint or ''
+        g.metrics_started = time.perf_counter()
+        g.metrics_blueprint = blueprint
+        REQUESTS_IN_PROGRESS.labels(blueprint).inc()
+    
+    @staticmethod
+    def _finish_request(response):
+        started = g.get('metrics_started')
+        if started is None:
+            return response
+        
+        # Unmatched URLs share one label so scanners cannot blow up cardinality
+        endpoint = request.endpoint or 'unmatched'
+        blueprint = g.metrics_blueprint
+        REQUEST_LATENCY.labels(blueprint, endpoint, request.method).observe(time.perf_counter() - started)
+        REQUEST_COUNT.labels(blueprint, endpoint, request.method, str(response.status_code)).inc()
+        return response
+    
+    @staticmethod
+    def _teardown_request(exc) -> None:
+        blueprint = g.pop('metrics_blueprint', None)
+        if blueprint is not None:
+            REQUESTS_IN_PROGRESS.labels(blueprint).dec()
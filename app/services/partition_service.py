@@ -0,0 +1,95 @@
+from app import db
+from flask import current_app
+from sqlalchemy import text
+from datetime import date, datetime
+from typing import Any, Dict, List
+import re
+
+class PartitionService:
+    """Service maintaining the monthly partitions of the activities table (MySQL)"""
+    
+    TABLE = 'activities'
+    FUTURE = 'p_future'
+    
+    @staticmethod
+    def maintain(retention_months: int = None, months_ahead: int = None,
+                 dry_run: bool = False) -> Dict[str, Any]:
+        """Pre-create upcoming month partitions and drop the ones past retention"""
+        config = current_app.config
+        retention_months = config.get('ACTIVITY_RETENTION_MONTHS', 12) if retention_months is None else retention_months
+        months_ahead = config.get('ACTIVITY_PARTITION_MONTHS_AHEAD', 3) if months_ahead is None else months_ahead
+        
+        if retention_months < 1:
+            raise ValueError('Retention must keep at least the current month')
+        
+        if db.engine.dialect.name != 'mysql':
+            return {'skipped': 'activities is only partitioned on MySQL'}
+        
+        months = PartitionService.get_partitions()
+        if not months:
+            return {'skipped': 'activities is not partitioned'}
+        
+        this_month = datetime.utcnow().date().replace(day=1)
+        wanted = [PartitionService._add_months(this_month, n) for n in range(months_ahead + 1)]
+        to_create = [month for month in wanted if month > max(months)]
+        
+        # A partition holds one month, so it expires once its whole month is out of retention
+        cutoff = PartitionService._add_months(this_month, -retention_months)
+        to_drop = [month for month in months if month < cutoff]
+        
+        if not dry_run:
+            if to_create:
+                PartitionService._split_future(to_create)
+            if to_drop:
+                names = ', '.join(PartitionService._name(month) for month in to_drop)
+                # Dropping a partition discards its rows without a row-by-row DELETE
+                with db.engine.begin() as connection:
+                    connection.execute(text(f'ALTER TABLE {PartitionService.TABLE} DROP PARTITION {names}'))
+        
+        return {
+            'created': [PartitionService._name(month) for month in to_create],
+            'dropped': [PartitionService._name(month) for month in to_drop],
+            'dry_run': dry_run
+        }
+    
+    @staticmethod
+    def get_partitions() -> List[date]:
+        """Get the first day of each monthly partition, oldest first"""
+        with db.engine.connect() as connection:
+            names = connection.execute(text(
+                "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL"
+            ), {'table': PartitionService.TABLE}).scalars().all()
+        
+        months = []
+        for name in names:
+            match = re.fullmatch(r'p(\d{4})(\d{2})', name)
+            if match:
+                months.append(date(int(match.group(1)), int(match.group(2)), 1))
+        return sorted(months)
+    
+    @staticmethod
+    def _split_future(months: List[date]) -> None:
+        """Carve new month partitions out of the catch-all one"""
+        # Cheap while p_future is empty, which running this ahead of time ensures
+        partitions = [
+            f"PARTITION {PartitionService._name(month)} VALUES LESS THAN "
+            f"('{PartitionService._add_months(month, 1):%Y-%m-%d}')"
+            for month in months
+        ]
+        partitions.append(f'PARTITION {PartitionService.FUTURE} VALUES LESS THAN (MAXVALUE)')
+        
+        with db.engine.begin() as connection:
+            connection.execute(text(
+                f"ALTER TABLE {PartitionService.TABLE} REORGANIZE PARTITION {PartitionService.FUTURE} "
+                f"INTO ({', '.join(partitions)})"
+            ))
+    
+    @staticmethod
+    def _name(month: date) -> str:
+        return f'p{month:%Y%m}'
+    
+    @staticmethod
+    def _add_months(day: date, months: int) -> date:
+        month = day.month - 1 + months
+        return date(day.year + month // 12, month % 12 + 1, 1)
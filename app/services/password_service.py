@@ -0,0 +1,160 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from flask import current_app, has_app_context
+from werkzeug.security import generate_password_hash, check_password_hash
+from typing import Any, Callable, Dict, List
+import multiprocessing
+import os
+import threading
+import time
+
+class HashingBusyError(Exception):
+    """Raised when the password hashing pool has no free slot"""
+    pass
+
+class PasswordService:
+    """Service running password key-stretching in a bounded process pool"""
+    
+    _executor = None
+    _executor_pid = None
+    _slots = None
+    _lock = threading.Lock()
+    _stats: Dict[str, Dict[str, float]] = {}
+    # Configured method -> the prefix werkzeug writes for it, defaults spelled out
+    _prefixes: Dict[str, str] = {}
+    
+    @staticmethod
+    def hash(password: str) -> str:
+        """Hash a password with the configured method"""
+        method = PasswordService._config('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+        return PasswordService.run('hash', generate_password_hash, password, method)
+    
+    @staticmethod
+    def hash_many(passwords: List[str]) -> List[str]:
+        """Hash several passwords, spreading them across the pool"""
+        method = PasswordService._config('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+        return PasswordService.run_many('hash', generate_password_hash, [(password, method) for password in passwords])
+    
+    @staticmethod
+    def verify(password_hash: str, password: str) -> bool:
+        """Check a password against a stored hash"""
+        return PasswordService.run('verify', check_password_hash, password_hash, password)
+    
+    @staticmethod
+    def needs_rehash(password_hash: str) -> bool:
+        """Check if a hash was made with other parameters than the configured ones"""
+        method = PasswordService._config('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+        return password_hash.split('$', 1)[0] != PasswordService._method_prefix(method)
+    
+    @staticmethod
+    def _method_prefix(method: str) -> str:
+        """Get the hash prefix for a method: 'scrypt' is stored as 'scrypt:32768:8:1'"""
+        prefix = PasswordService._prefixes.get(method)
+        if prefix is None:
+            # Let werkzeug expand its own defaults rather than copying them here
+            prefix = generate_password_hash('', method).split('$', 1)[0]
+            PasswordService._prefixes[method] = prefix
+        return prefix
+    
+    @staticmethod
+    def run(operation: str, fn: Callable, *args) -> Any:
+        """Run a picklable CPU-bound function in the pool, or inline if disabled"""
+        return PasswordService.run_many(operation, fn, [args])[0]
+    
+    @staticmethod
+    def run_many(operation: str, fn: Callable, calls: List[tuple]) -> List[Any]:
+        """Run fn once per argument tuple in the pool, keeping the order of calls"""
+        started = time.perf_counter()
+        workers = PasswordService._config('PASSWORD_HASH_WORKERS', 0)
+        
+        if not workers or not calls:
+            results = [fn(*args) for args in calls]
+            PasswordService._record(operation, len(calls), started, started)
+            return results
+        
+        # One slot per waiting caller bounds how far a login burst can pile up
+        slots = PasswordService._get_slots()
+        timeout = PasswordService._config('PASSWORD_HASH_QUEUE_TIMEOUT', 2.0)
+        if not slots.acquire(timeout=timeout):
+            PasswordService._record(operation, 0, started, started, rejected=len(calls))
+            raise HashingBusyError('Password hashing queue is full')
+        
+        try:
+            queued = time.perf_counter()
+            try:
+                executor = PasswordService._get_executor()
+                if len(calls) == 1:
+                    results = [executor.submit(fn, *calls[0]).result()]
+                else:
+                    chunksize = max(1, len(calls) // (workers * 4))
+                    results = list(executor.map(fn, *zip(*calls), chunksize=chunksize))
+            except BrokenProcessPool:
+                # A worker died; start a fresh pool next time and finish this call inline
+                PasswordService._reset_executor()
+                results = [fn(*args) for args in calls]
+        finally:
+            slots.release()
+        
+        PasswordService._record(operation, len(calls), started, queued)
+        return results
+    
+    @staticmethod
+    def stats() -> Dict[str, Dict[str, float]]:
+        """Get per-operation hashing counters and latencies"""
+        with PasswordService._lock:
+            return {operation: dict(values) for operation, values in PasswordService._stats.items()}
+    
+    @staticmethod
+    def _get_executor() -> ProcessPoolExecutor:
+        if PasswordService._executor is None or PasswordService._executor_pid != os.getpid():
+            with PasswordService._lock:
+                if PasswordService._executor is None or PasswordService._executor_pid != os.getpid():
+                    # spawn: forking a threaded worker could copy held locks into the children
+                    PasswordService._executor = ProcessPoolExecutor(
+                        max_workers=PasswordService._config('PASSWORD_HASH_WORKERS', 0),
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+                    PasswordService._executor_pid = os.getpid()
+        return PasswordService._executor
+    
+    @staticmethod
+    def _reset_executor() -> None:
+        with PasswordService._lock:
+            executor = PasswordService._executor
+            PasswordService._executor = None
+        if executor is not None:
+            executor.shutdown(wait=False)
+    
+    @staticmethod
+    def _get_slots() -> threading.BoundedSemaphore:
+        if PasswordService._slots is None:
+            with PasswordService._lock:
+                if PasswordService._slots is None:
+                    size = (PasswordService._config('PASSWORD_HASH_WORKERS', 0) +
+                            PasswordService._config('PASSWORD_HASH_QUEUE_DEPTH', 32))
+                    PasswordService._slots = threading.BoundedSemaphore(size)
+        return PasswordService._slots
+    
+    @staticmethod
+    def _record(operation: str, count: int, started: float, queued: float, rejected: int = 0) -> None:
+        now = time.perf_counter()
+        with PasswordService._lock:
+            stats = PasswordService._stats.setdefault(operation, {
+                'count': 0,
+                'rejected': 0,
+                'total_seconds': 0.0,
+                'max_seconds': 0.0,
+                'queue_wait_seconds': 0.0
+            })
+            stats['count'] += count
+            stats['rejected'] += rejected
+            if count:
+                stats['total_seconds'] += now - started
+                stats['max_seconds'] = max(stats['max_seconds'], now - started)
+                stats['queue_wait_seconds'] += queued - started
+    
+    @staticmethod
+    def _config(key: str, default: Any) -> Any:
+        if has_app_context():
+            return current_app.config.get(key, default)
+        return default
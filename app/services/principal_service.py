@@ -0,0 +1,52 @@
+from app.repositories.user_repository import UserRepository
+from flask import g
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from typing import Dict, Any, Optional
+
+class Principal:
+    """Read-only view of an authenticated user, shared for one request"""
+    
+    def __init__(self, snapshot: Dict[str, Any]):
+        self.id = snapshot['id']
+        self.username = snapshot['username']
+        self.email = snapshot['email']
+        self.role = snapshot['role']
+        self.is_active = snapshot['is_active']
+        self.is_deleted = snapshot['is_deleted']
+        self.created_at = snapshot['created_at']
+        self.updated_at = snapshot['updated_at']
+        self.last_login = snapshot['last_login']
+        self.token_version = snapshot['token_version']
+    
+    def is_admin(self) -> bool:
+        """Check if principal is admin"""
+        return self.role == 'admin'
+    
+    def __repr__(self):
+        return f'<Principal {self.username}>'
+
+class PrincipalService:
+    """Service resolving user IDs to principals once per request"""
+    
+    @staticmethod
+    def get(user_id: Any) -> Optional[Principal]:
+        """Get the principal for a user ID, loading it at most once per request"""
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return None
+        
+        if 'principals' not in g:
+            g.principals = {}
+        
+        if user_id not in g.principals:
+            snapshot = UserRepository.get_snapshot(user_id)
+            g.principals[user_id] = Principal(snapshot) if snapshot else None
+        
+        return g.principals[user_id]
+    
+    @staticmethod
+    def current() -> Optional[Principal]:
+        """Get the principal for the JWT of the current request, if any"""
+        verify_jwt_in_request(optional=True)
+        return PrincipalService.get(get_jwt_identity())
@@ -0,0 +1,143 @@
+from flask import current_app
+from typing import Dict, Tuple
+import math
+import threading
+import time
+
+# GCRA: each key stores a theoretical arrival time (TAT). A request may take
+# up to `quantity` tokens, fewer if the burst allowance is nearly used up, so
+# a caller can lease a small batch and spend it locally.
+GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local quantity = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+local available = math.floor((now + burst - tat) / interval)
+if available < 1 then
+    return {0, math.ceil(tat + interval - burst - now)}
+end
+local granted = math.min(available, quantity)
+local new_tat = tat + interval * granted
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+return {granted, 0}
+"""
+
+class MemoryRateLimitBackend:
+    """In-process GCRA store, for development and single-process tests"""
+    
+    def __init__(self):
+        self._tats: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def acquire(self, key: str, interval: float, burst: float, quantity: int) -> Tuple[int, float]:
+        """Take up to quantity tokens, returns (granted, retry_after_ms)"""
+        now = time.time() * 1000
+        with self._lock:
+            tat = max(self._tats.get(key, now), now)
+            available = math.floor((now + burst - tat) / interval)
+            if available < 1:
+                return 0, tat + interval - burst - now
+            
+            granted = min(available, quantity)
+            self._tats[key] = tat + interval * granted
+            
+            # Keys whose TAT has passed carry no state, prune them now and then
+            if len(self._tats) > 10000:
+                self._tats = {k: v for k, v in self._tats.items() if v > now}
+        return granted, 0.0
+
+class RedisRateLimitBackend:
+    """GCRA store shared by all workers, one atomic Lua call per decision"""
+    
+    def __init__(self, client):
+        self.client = client
+        self.script = client.register_script(GCRA_SCRIPT)
+    
+    def acquire(self, key: str, interval: float, burst: float, quantity: int) -> Tuple[int, float]:
+        """Take up to quantity tokens, returns (granted, retry_after_ms)"""
+        now = int(time.time() * 1000)
+        granted, retry_after = self.script(keys=[key], args=[interval, burst, quantity, now])
+        return int(granted), float(retry_after)
+
+class RateLimitService:
+    """Service enforcing per-key GCRA limits with a small local token cache"""
+    
+    def __init__(self, backend, lease_size: int = 1, lease_ttl: float = 1.0, lease_min_limit: int = 100):
+        self.backend = backend
+        self.lease_size = lease_size
+        self.lease_ttl = lease_ttl
+        self.lease_min_limit = lease_min_limit
+        # key -> [tokens left, expires at, is denial]
+        self._local: Dict[str, list] = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def init_app(app, redis_client=None) -> None:
+        """Create the limiter for an app, pass redis_client to use a stand-in"""
+        if app.config.get('RATELIMIT_BACKEND', 'memory') == 'redis':
+            if redis_client is None:
+                import redis
+                redis_client = redis.from_url(app.config['RATELIMIT_REDIS_URL'])
+            backend = RedisRateLimitBackend(redis_client)
+        else:
+            backend = MemoryRateLimitBackend()
+        
+        app.extensions['rate_limiter'] = RateLimitService(
+            backend,
+            lease_size=app.config.get('RATELIMIT_LOCAL_BATCH', 1),
+            lease_ttl=app.config.get('RATELIMIT_LOCAL_TTL', 1.0),
+            lease_min_limit=app.config.get('RATELIMIT_LOCAL_MIN_LIMIT', 100)
+        )
+    
+    @staticmethod
+    def get() -> 'RateLimitService':
+        """Get the limiter of the current app"""
+        return current_app.extensions['rate_limiter']
+    
+    def hit(self, key: str, limit: int, period: float) -> Tuple[bool, float]:
+        """Count one request against key, returns (allowed, retry_after_seconds)"""
+        now = time.monotonic()
+        
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is not None and entry[1] > now:
+                if entry[0] > 0:
+                    entry[0] -= 1
+                    return True, 0.0
+                if entry[0] == 0 and entry[2]:
+                    # Cached denial: reject without asking the backend again
+                    return False, entry[1] - now
+        
+        interval = period * 1000.0 / limit
+        burst = period * 1000.0
+        # Tokens left in a lease when it expires are lost, which would eat into
+        # small limits such as 10 logins a minute: only lease on generous
+        # limits, and never more than a quarter of one
+        quantity = 1
+        if limit >= self.lease_min_limit:
+            quantity = max(1, min(self.lease_size, limit // 4))
+        
+        try:
+            granted, retry_after_ms = self.backend.acquire(key, interval, burst, quantity)
+        except Exception as e:
+            # Fail open: an unavailable limiter store must not take the API down
+            current_app.logger.error(f"Rate limit backend error: {str(e)}")
+            return True, 0.0
+        
+        with self._lock:
+            if granted:
+                self._local[key] = [granted - 1, now + self.lease_ttl, False]
+                allowed, retry_after = True, 0.0
+            else:
+                retry_after = retry_after_ms / 1000.0
+                self._local[key] = [0, now + retry_after, True]
+                allowed = False
+            
+            if len(self._local) > 10000:
+                self._local = {k: v for k, v in self._local.items() if v[1] > now}
+        
+        return allowed, retry_after
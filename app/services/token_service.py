@@ -8,11 +8,12 @@ class TokenService:
     """Service for JWT token operations"""
     
     @staticmethod
-    def generate_access_token(user_id: int, role: str) -> str:
+    def generate_access_token(user_id: int, role: str, token_version: int = 0) -> str:
         """Generate JWT access token"""
+        from app.services.authorization_service import AuthorizationService
         return create_access_token(
             identity=user_id,
-            additional_claims={'role': role}
+            additional_claims=AuthorizationService.get_token_claims(role, token_version)
         )
     
     @staticmethod
@@ -0,0 +1,162 @@
+from app.repositories.user_repository import UserRepository
+from app.services.authorization_service import AuthorizationService
+from app.services.password_service import PasswordService, HashingBusyError
+from app.utils.validators import validate_email, validate_password, validate_username
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import codecs
+import csv
+import json
+
+class UserImportService:
+    """Service for streaming bulk user imports from CSV or JSON Lines"""
+    
+    FORMATS = ('csv', 'jsonl')
+    
+    @staticmethod
+    def import_users(stream: Iterable[bytes], fmt: str, default_role: str = 'user',
+                     chunk_size: Optional[int] = None) -> Dict[str, Any]:
+        """Import users from a binary line stream, chunk by chunk, collecting per-row errors"""
+        if fmt not in UserImportService.FORMATS:
+            raise ValueError(f'Unknown import format: {fmt}')
+        
+        chunk_size = chunk_size or current_app.config.get('IMPORT_CHUNK_SIZE', 1000)
+        report = {'processed': 0, 'created': 0, 'duplicates': 0, 'failed': 0, 'errors': []}
+        # Lowercased identities already seen in this file
+        seen_usernames, seen_emails = set(), set()
+        
+        chunk = []
+        try:
+            for line, row in UserImportService._parse(stream, fmt):
+                report['processed'] += 1
+                chunk.append((line, row))
+                if len(chunk) >= chunk_size:
+                    UserImportService._import_chunk(chunk, default_role, seen_usernames, seen_emails, report)
+                    chunk = []
+        except (UnicodeDecodeError, csv.Error) as e:
+            # Rows before the unreadable part are kept; report where it stopped
+            report['aborted'] = f'Unreadable input after line {chunk[-1][0] if chunk else 0}: {str(e)}'
+        if chunk:
+            UserImportService._import_chunk(chunk, default_role, seen_usernames, seen_emails, report)
+        
+        return report
+    
+    @staticmethod
+    def _parse(stream: Iterable[bytes], fmt: str) -> Iterator[Tuple[int, Any]]:
+        """Yield (line number, row dict) pairs, or (line number, error message)"""
+        # utf-8-sig drops the BOM spreadsheet exports like to add
+        lines = codecs.iterdecode(stream, 'utf-8-sig')
+        
+        if fmt == 'csv':
+            reader = csv.DictReader(lines)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        
+        for line, text in enumerate(lines, start=1):
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except ValueError:
+                yield line, 'Invalid JSON'
+                continue
+            yield line, row if isinstance(row, dict) else 'Expected a JSON object'
+    
+    @staticmethod
+    def _validate(row: Any, default_role: str) -> Tuple[Optional[Dict[str, str]], Optional[str]]:
+        if not isinstance(row, dict):
+            return None, row
+        
+        # JSONL rows may hold numbers, lists or objects where CSV only has text
+        for field in ('username', 'email', 'password', 'role'):
+            if row.get(field) is not None and not isinstance(row[field], str):
+                return None, f'{field} must be a string'
+        
+        username = (row.get('username') or '').strip()
+        email = (row.get('email') or '').strip()
+        password = row.get('password') or ''
+        role = (row.get('role') or '').strip() or default_role
+        
+        if not validate_username(username):
+            return None, 'Username must be 3-20 letters, numbers or underscores'
+        if not validate_email(email):
+            return None, 'Invalid email format'
+        if not validate_password(password):
+            return None, 'Password must be at least 8 characters and contain letters and numbers'
+        if role not in AuthorizationService.PERMISSIONS:
+            return None, f'Invalid role: {role}'
+        
+        return {'username': username, 'email': email, 'password': password, 'role': role}, None
+    
+    @staticmethod
+    def _import_chunk(chunk: List[Tuple[int, Any]], default_role: str,
+                      seen_usernames: set, seen_emails: set, report: Dict[str, Any]) -> None:
+        valid = []
+        for line, row in chunk:
+            user_data, error = UserImportService._validate(row, default_role)
+            if error:
+                UserImportService._fail(report, line, error)
+                continue
+            
+            username, email = user_data['username'].lower(), user_data['email'].lower()
+            if username in seen_usernames or email in seen_emails:
+                UserImportService._fail(report, line, 'Duplicate username or email in file', duplicate=True)
+                continue
+            seen_usernames.add(username)
+            seen_emails.add(email)
+            valid.append((line, user_data))
+        
+        if not valid:
+            return
+        
+        # One lookup for the whole chunk instead of two queries per row
+        taken_usernames, taken_emails = UserRepository.get_taken_identities(
+            [user_data['username'] for _, user_data in valid],
+            [user_data['email'] for _, user_data in valid]
+        )
+        fresh = []
+        for line, user_data in valid:
+            if user_data['username'].lower() in taken_usernames:
+                UserImportService._fail(report, line, 'Username already taken', duplicate=True)
+            elif user_data['email'].lower() in taken_emails:
+                UserImportService._fail(report, line, 'Email already registered', duplicate=True)
+            else:
+                fresh.append((line, user_data))
+        
+        if not fresh:
+            return
+        
+        try:
+            hashes = PasswordService.hash_many([user_data['password'] for _, user_data in fresh])
+        except HashingBusyError:
+            for line, _ in fresh:
+                UserImportService._fail(report, line, 'Server busy, row not imported')
+            return
+        
+        rows = []
+        for (_, user_data), password_hash in zip(fresh, hashes):
+            rows.append({
+                'username': user_data['username'],
+                'email': user_data['email'],
+                'password_hash': password_hash,
+                'role': user_data['role']
+            })
+        
+        try:
+            report['created'] += UserRepository.create_many(rows)
+        except IntegrityError:
+            # Someone registered one of these meanwhile; insert row by row to find it
+            for (line, _), row in zip(fresh, rows):
+                try:
+                    report['created'] += UserRepository.create_many([row])
+                except IntegrityError:
+                    UserImportService._fail(report, line, 'Username or email already in use', duplicate=True)
+    
+    @staticmethod
+    def _fail(report: Dict[str, Any], line: int, error: str, duplicate: bool = False) -> None:
+        report['duplicates' if duplicate else 'failed'] += 1
+        # Keep the report bounded however bad the file is
+        if len(report['errors']) < current_app.config.get('IMPORT_MAX_ERRORS', 1000):
+            report['errors'].append({'line': line, 'error': error})
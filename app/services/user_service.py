@@ -1,12 +1,29 @@
+from app.models.user import User
 from app.repositories.user_repository import UserRepository
+from app.repositories.activity_repository import ActivityRepository
 from app.services.activity_service import ActivityService
+from app.services.authorization_service import AuthorizationService
+from app.services.availability_service import AvailabilityService
+from app.services.cache_service import CacheService
+from app.services.password_service import HashingBusyError
+from app.utils.serializers import RowSerializer
 from app.utils.validators import validate_email, validate_password
-from typing import Dict, Any, Tuple, List
-from flask import request
+from app.utils.pagination import InvalidCursorError
+from sqlalchemy.exc import IntegrityError
+from typing import Dict, Any, Tuple, List, Optional
+from flask import request, current_app
+from datetime import datetime
 
 class UserService:
     """Service for user operations"""
     
+    PROFILE_SERIALIZER = RowSerializer.for_model(
+        User, ['id', 'username', 'email', 'role', 'created_at', 'last_login']
+    )
+    ADMIN_USER_SERIALIZER = RowSerializer.for_model(
+        User, ['id', 'username', 'email', 'role', 'is_active', 'created_at', 'last_login']
+    )
+    
     @staticmethod
     def get_profile(user_id: int) -> Tuple[Dict[str, Any], int]:
         """Get user profile"""
@@ -14,14 +31,7 @@ class UserService:
         if not user:
             return {'error': 'User not found'}, 404
         
-        return {
-            'id': user.id,
-            'username': user.username,
-            'email': user.email,
-            'role': user.role,
-            'created_at': user.created_at.isoformat(),
-            'last_login': user.last_login.isoformat() if user.last_login else None
-        }, 200
+        return UserService.PROFILE_SERIALIZER.to_dict(user), 200
     
     @staticmethod
     def update_profile(user_id: int, user_data: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
@@ -91,43 +101,59 @@ class UserService:
             return {'error': str(e)}, 500
     
     @staticmethod
-    def get_all_users(page: int = 1, per_page: int = 20) -> Tuple[Dict[str, Any], int]:
-        """Get all users (admin only)"""
-        users = UserRepository.get_all(page, per_page)
+    def get_all_users(page: int = 1, per_page: int = 20, cursor: Optional[str] = None) -> Tuple[Dict[str, Any], int]:
+        """Get all users (admin only), keyset paginated when a cursor is given"""
+        # Tagged 'users': any user write bumps it, so entries never go stale
+        position = f'c:{cursor}' if cursor is not None else f'p:{page}'
+        key = CacheService.tagged_key(f'admin_users:{position}:{per_page}', ['users'])
+        try:
+            result = CacheService.get_or_load(
+                key,
+                lambda: UserService._load_users(page, per_page, cursor),
+                timeout=current_app.config.get('ADMIN_CACHE_TTL', 600)
+            )
+        except InvalidCursorError:
+            return {'error': 'Invalid cursor'}, 400
+        return result, 200
+    
+    @staticmethod
+    def _load_users(page: int, per_page: int, cursor: Optional[str]) -> Dict[str, Any]:
+        if cursor is not None:
+            users, next_cursor = UserRepository.get_all_after(cursor, per_page)
+        else:
+            users = UserRepository.get_all(page, per_page)
         
-        return {
-            'users': [
-                {
-                    'id': user.id,
-                    'username': user.username,
-                    'email': user.email,
-                    'role': user.role,
-                    'is_active': user.is_active,
-                    'created_at': user.created_at.isoformat(),
-                    'last_login': user.last_login.isoformat() if user.last_login else None
-                }
-                for user in users
-            ],
-            'page': page,
+        result = {
+            'users': UserService.ADMIN_USER_SERIALIZER.to_dicts(users),
             'per_page': per_page
-        }, 200
+        }
+        
+        if cursor is not None:
+            result['next_cursor'] = next_cursor
+        else:
+            result['page'] = page
+        return result
     
     @staticmethod
     def get_user_by_id(user_id: int) -> Tuple[Dict[str, Any], int]:
         """Get user by ID (admin only)"""
+        key = CacheService.tagged_key(f'admin_user:{user_id}', [f'user:{user_id}'])
+        result = CacheService.get_or_load(
+            key,
+            lambda: UserService._load_user(user_id),
+            timeout=current_app.config.get('ADMIN_CACHE_TTL', 600)
+        )
+        if result is None:
+            return {'error': 'User not found'}, 404
+        return result, 200
+    
+    @staticmethod
+    def _load_user(user_id: int) -> Optional[Dict[str, Any]]:
         user = UserRepository.get_by_id(user_id)
         if not user:
-            return {'error': 'User not found'}, 404
+            return None
         
-        return {
-            'id': user.id,
-            'username': user.username,
-            'email': user.email,
-            'role': user.role,
-            'is_active': user.is_active,
-            'created_at': user.created_at.isoformat(),
-            'last_login': user.last_login.isoformat() if user.last_login else None
-        }, 200
+        return UserService.ADMIN_USER_SERIALIZER.to_dict(user)
     
     @staticmethod
     def create_user(user_data: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
@@ -140,10 +166,11 @@ class UserService:
             return {'error': 'Password must be at least 8 characters and contain letters and numbers'}, 400
         
         # Check if user already exists
-        if UserRepository.get_by_email(user_data.get('email')):
+        # Names nobody has are answered by the Bloom filter without a query
+        if AvailabilityService.is_taken('email', user_data.get('email')):
             return {'error': 'Email already registered'}, 409
         
-        if UserRepository.get_by_username(user_data.get('username')):
+        if AvailabilityService.is_taken('username', user_data.get('username')):
             return {'error': 'Username already taken'}, 409
         
         # Create user
@@ -167,6 +194,11 @@ class UserService:
                     'role': user.role
                 }
             }, 201
+        except HashingBusyError:
+            return {'error': 'Server busy, please try again shortly'}, 503
+        except IntegrityError:
+            # Taken by a user the checks above could not see yet
+            return {'error': 'Username or email already taken'}, 409
         except Exception as e:
             return {'error': str(e)}, 500
     
@@ -247,3 +279,58 @@ class UserService:
         except Exception as e:
             return {'error': str(e)}, 500
 
+    
+    # Bulk operation -> (column values, activity action, activity details)
+    BULK_OPERATIONS = {
+        'activate': ({'is_active': True}, 'user_activated', 'User activated by admin'),
+        'deactivate': ({'is_active': False}, 'user_deactivated', 'User deactivated by admin'),
+        'soft_delete': ({'is_deleted': True, 'is_active': False}, 'user_deleted', 'User deleted by admin'),
+        'change_role': ({}, 'user_updated', 'User role changed by admin')
+    }
+    
+    @staticmethod
+    def bulk_update_users(user_ids: List[int], operation: str,
+                          role: Optional[str] = None) -> Tuple[Dict[str, Any], int]:
+        """Apply one operation to many users in a single transaction (admin only)"""
+        if operation not in UserService.BULK_OPERATIONS:
+            return {'error': f'Unknown operation, expected one of: {", ".join(UserService.BULK_OPERATIONS)}'}, 400
+        
+        if (not isinstance(user_ids, list) or not user_ids or
+                not all(isinstance(user_id, int) and not isinstance(user_id, bool) for user_id in user_ids)):
+            return {'error': 'user_ids must be a non-empty list of integers'}, 400
+        
+        max_ids = current_app.config.get('BULK_MAX_USERS', 1000)
+        if len(user_ids) > max_ids:
+            return {'error': f'At most {max_ids} users can be changed at once'}, 400
+        
+        values, action, details = UserService.BULK_OPERATIONS[operation]
+        if operation == 'change_role':
+            if role not in AuthorizationService.PERMISSIONS:
+                return {'error': f'Invalid role, expected one of: {", ".join(AuthorizationService.PERMISSIONS)}'}, 400
+            values = {'role': role}
+            details = f'User role changed to {role} by admin'
+        
+        try:
+            existing_ids = UserRepository.get_existing_ids(sorted(set(user_ids)))
+            missing_ids = sorted(set(user_ids) - set(existing_ids))
+            
+            if existing_ids:
+                # Audit rows and the UPDATE go out in the same transaction
+                audit = {
+                    'action': action,
+                    'details': details,
+                    'ip_address': request.remote_addr,
+                    'user_agent': request.user_agent.string,
+                    'timestamp': datetime.utcnow()
+                }
+                ActivityRepository.create_many([dict(audit, user_id=user_id) for user_id in existing_ids], commit=False)
+                UserRepository.bulk_update(existing_ids, values)
+            
+            return {
+                'message': f'{len(existing_ids)} users updated',
+                'operation': operation,
+                'updated': existing_ids,
+                'not_found': missing_ids
+            }, 200
+        except Exception as e:
+            return {'error': str(e)}, 500
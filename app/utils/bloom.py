@@ -0,0 +1,44 @@
+import hashlib
+import math
+import threading
+
+class BloomFilter:
+    """Fixed-size Bloom filter of strings: no false negatives, tunable false positives"""
+    
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(capacity, 1)
+        # Optimal bit count and hash count for the capacity and error rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.capacity = capacity
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+    
+    def add(self, item: str) -> None:
+        """Add an item"""
+        positions = self._positions(item)
+        # Setting a bit is a read-modify-write of its byte
+        with self._lock:
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+    
+    def __contains__(self, item: str) -> bool:
+        """False means definitely absent, True means probably present"""
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+    
+    def _positions(self, item: str):
+        # Two 64-bit halves of one digest, combined by double hashing (Kirsch-Mitzenmacher)
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
@@ -1,8 +1,10 @@
 from functools import wraps
-from flask import request, jsonify
+from flask import request, jsonify, current_app
 from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_jwt_identity
 from app.services.authorization_service import AuthorizationService
-from app.repositories.user_repository import UserRepository
+from app.services.principal_service import PrincipalService
+from app.services.rate_limit_service import RateLimitService
+import math
 
 def admin_required(fn=None):
     """Decorator to require admin role for a route"""
@@ -14,9 +16,16 @@ def admin_required(fn=None):
     def wrapper(*args, **kwargs):
         verify_jwt_in_request()
         
-        # Get user from db
-        user_id = get_jwt_identity()
-        user = UserRepository.get_by_id(user_id)
+        # Stateless mode: trust the signed role claim if the token is current
+        if current_app.config.get('AUTHZ_MODE') == 'claims':
+            allowed = AuthorizationService.authorize_claims(get_jwt(), role='admin')
+            if allowed is not None:
+                if not allowed:
+                    return jsonify({'error': 'Admin privileges required'}), 403
+                return fn(*args, **kwargs)
+        
+        # Get user, loaded once per request and cached across requests
+        user = PrincipalService.get(get_jwt_identity())
         
         # Check if user is an admin
         if not user or user.role != 'admin':
@@ -35,7 +44,13 @@ def permission_required(permission):
                 claims = get_jwt()
                 user_id = claims.get('sub')
                 
-                if not AuthorizationService.has_permission(user_id, permission):
+                allowed = None
+                if current_app.config.get('AUTHZ_MODE') == 'claims':
+                    allowed = AuthorizationService.authorize_claims(claims, permission=permission)
+                if allowed is None:
+                    allowed = AuthorizationService.has_permission(user_id, permission)
+                
+                if not allowed:
                     return jsonify(error='Permission denied'), 403
                 return fn(*args, **kwargs)
             except Exception as e:
@@ -43,13 +58,35 @@ def permission_required(permission):
         return wrapper
     return decorator
 
-def rate_limit(limit, period):
-    """Decorator to limit request rate"""
+def rate_limit(limit, period, key_by='user'):
+    """Decorator to limit request rate to `limit` requests per `period` seconds"""
+    # key_by='user' counts per JWT identity (client IP when anonymous), 'ip' per client IP
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            # This would be implemented with a proper rate limiting solution
-            # For now, we'll just pass through
+            if not current_app.config.get('RATELIMIT_ENABLED', True):
+                return fn(*args, **kwargs)
+            
+            identity = None
+            if key_by == 'user':
+                try:
+                    verify_jwt_in_request(optional=True)
+                    identity = get_jwt_identity()
+                except Exception:
+                    # Invalid tokens are rejected by the view itself, count by IP here
+                    identity = None
+            
+            if identity is not None:
+                key = f'rl:{request.endpoint}:user:{identity}'
+            else:
+                key = f'rl:{request.endpoint}:ip:{request.remote_addr}'
+            
+            allowed, retry_after = RateLimitService.get().hit(key, limit, period)
+            if not allowed:
+                response = jsonify({'error': 'Too many requests, please try again later'})
+                response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+                return response, 429
+            
             return fn(*args, **kwargs)
         return wrapper
     return decorator
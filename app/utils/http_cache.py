@@ -0,0 +1,54 @@
+from functools import wraps
+from flask import current_app, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from app.repositories.user_repository import UserRepository
+from werkzeug.http import is_resource_modified
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+import hashlib
+
+def user_validators(snapshot: Dict[str, Any], fields: Iterable[str]) -> Tuple[str, Optional[datetime]]:
+    """Get the ETag and Last-Modified of a representation made of a user's fields"""
+    # Hash the represented values, not just updated_at: MySQL DATETIME keeps
+    # whole seconds, so two writes within a second would share a timestamp
+    values = repr(tuple(snapshot.get(field) for field in fields)).encode('utf-8')
+    etag = hashlib.blake2b(values, digest_size=12).hexdigest()
+    
+    updated_at = snapshot.get('updated_at')
+    last_modified = updated_at.replace(tzinfo=timezone.utc, microsecond=0) if updated_at else None
+    return etag, last_modified
+
+def conditional_user(*fields: str, user_id_arg: Optional[str] = None):
+    """Answer 304 Not Modified when the client's copy of a user resource is current
+    
+    Validators come from the cached user snapshot, so an unchanged resource is
+    answered without loading the row or building the body. The user is the
+    current identity, or the view argument named by user_id_arg.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            user_id = kwargs[user_id_arg] if user_id_arg else get_jwt_identity()
+            snapshot = UserRepository.get_snapshot(user_id)
+            if snapshot is None:
+                return fn(*args, **kwargs)
+            
+            etag, last_modified = user_validators(snapshot, fields)
+            if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            
+            response.set_etag(etag, weak=True)
+            if last_modified:
+                response.last_modified = last_modified
+            # Private data: browsers may keep it but must revalidate every time
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            return response
+        
+        return wrapper
+    
+    return decorator
@@ -0,0 +1,50 @@
+from flask.json.provider import DefaultJSONProvider
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes and decodes with orjson
+    
+    Output matches the default provider's: keys are sorted when sort_keys is
+    set, indented in debug mode, and dates, decimals and other types orjson
+    leaves alone go through the same default hook (so datetimes stay HTTP
+    dates). Non-ASCII text is written as UTF-8 rather than escaped. Anything
+    orjson refuses, such as integers over 64 bits, is encoded by the default
+    provider instead.
+    """
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serialize data as JSON, with the stdlib encoder when json.dumps arguments are given"""
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._encode(obj, indent=False).decode('utf-8')
+    
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        """Deserialize data as JSON, with the stdlib decoder when json.loads arguments are given"""
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+    
+    def response(self, *args: Any, **kwargs: Any):
+        """Serialize the arguments as JSON straight into the response body"""
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._encode(obj, indent) + b'\n', mimetype=self.mimetype)
+    
+    def _encode(self, obj: Any, indent: bool) -> bytes:
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        
+        try:
+            return orjson.dumps(obj, default=self.default, option=option)
+        except orjson.JSONEncodeError:
+            if indent:
+                return super().dumps(obj, indent=2).encode('utf-8')
+            return super().dumps(obj, separators=(',', ':')).encode('utf-8')
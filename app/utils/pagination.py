@@ -0,0 +1,32 @@
+import base64
+import binascii
+import json
+from typing import Dict, Any, Tuple
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+    pass
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """Encode a keyset position into an opaque URL-safe cursor"""
+    raw = json.dumps(position, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, binascii.Error, UnicodeError):
+        raise InvalidCursorError('Invalid cursor')
+    
+    if not isinstance(position, dict):
+        raise InvalidCursorError('Invalid cursor')
+    
+    return position
+
+def page_bounds(page: int, per_page: int) -> Tuple[int, int]:
+    """Get the LIMIT and OFFSET of a page, out of range values treated like paginate(error_out=False)"""
+    page = page if page >= 1 else 1
+    per_page = per_page if per_page >= 1 else 20
+    return per_page, (page - 1) * per_page
@@ -0,0 +1,145 @@
+from contextlib import contextmanager
+from flask import g, current_app, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from typing import Any, Dict, List, Optional, Tuple
+import threading
+import time
+
+class QueryStats:
+    """Statements and database time recorded for one request or capture"""
+    
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: List[Tuple[str, Any]] = []
+        self.repeats: Dict[str, int] = {}
+    
+    def record(self, statement: str, parameters: Any, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.statements.append((statement, parameters))
+        self.repeats[statement] = self.repeats.get(statement, 0) + 1
+    
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """Get statements issued at least threshold times, a sign of N+1 loading"""
+        return {statement: n for statement, n in self.repeats.items() if n >= threshold}
+
+class QueryCounter:
+    """Counts SQL statements and database time per request via engine events"""
+    
+    _installed = False
+    _install_lock = threading.Lock()
+    _captures = threading.local()
+    
+    @staticmethod
+    def init_app(app) -> None:
+        """Instrument all engines and report per-request totals in Server-Timing"""
+        if not app.config.get('SQL_INSTRUMENTATION', False):
+            return
+        
+        QueryCounter.install()
+        app.before_request(QueryCounter._start_request)
+        app.after_request(QueryCounter._finish_request)
+    
+    @staticmethod
+    def install() -> None:
+        """Attach the engine listeners once per process"""
+        with QueryCounter._install_lock:
+            if QueryCounter._installed:
+                return
+            event.listen(Engine, 'before_cursor_execute', QueryCounter._before_execute)
+            event.listen(Engine, 'after_cursor_execute', QueryCounter._after_execute)
+            QueryCounter._installed = True
+    
+    @staticmethod
+    def current() -> Optional[QueryStats]:
+        """Get the stats of the current request, if it is being counted"""
+        if has_request_context():
+            return g.get('query_stats')
+        return None
+    
+    @staticmethod
+    @contextmanager
+    def capture():
+        """Record every statement run by this thread inside the block"""
+        QueryCounter.install()
+        stats = QueryStats()
+        stack = QueryCounter._capture_stack()
+        stack.append(stats)
+        try:
+            yield stats
+        finally:
+            stack.remove(stats)
+    
+    @staticmethod
+    @contextmanager
+    def assert_max_queries(limit: int):
+        """Fail with the offending statements if the block runs more than limit queries
+        
+        Raises AssertionError, so it works as-is inside any test function::
+        
+            with QueryCounter.assert_max_queries(3):
+                client.get('/user/profile', headers=auth_headers)
+        """
+        with QueryCounter.capture() as stats:
+            yield stats
+        
+        if stats.count > limit:
+            listing = '\n'.join(f'  {statement}' for statement, _ in stats.statements)
+            raise AssertionError(f'Expected at most {limit} queries, got {stats.count}:\n{listing}')
+    
+    @staticmethod
+    def _capture_stack() -> list:
+        if not hasattr(QueryCounter._captures, 'stack'):
+            QueryCounter._captures.stack = []
+        return QueryCounter._captures.stack
+    
+    @staticmethod
+    def _targets() -> List[QueryStats]:
+        targets = list(QueryCounter._capture_stack())
+        stats = QueryCounter.current()
+        if stats is not None:
+            targets.append(stats)
+        return targets
+    
+    @staticmethod
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        # On the execution context, not the connection: a statement that raises
+        # never reaches after_cursor_execute, and its start time dies with it
+        if context is not None:
+            context._query_started = time.perf_counter()
+    
+    @staticmethod
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_query_started', None)
+        duration = time.perf_counter() - started if started is not None else 0.0
+        
+        for stats in QueryCounter._targets():
+            stats.record(statement, parameters, duration)
+    
+    @staticmethod
+    def _start_request() -> None:
+        g.query_stats = QueryStats()
+        g.request_started = time.perf_counter()
+    
+    @staticmethod
+    def _finish_request(response):
+        stats = g.get('query_stats')
+        if stats is None:
+            return response
+        
+        threshold = current_app.config.get('SQL_N_PLUS_ONE_THRESHOLD', 3)
+        for statement, times in stats.repeated(threshold).items():
+            current_app.logger.warning(
+                'Probable N+1 on %s: statement ran %d times: %s',
+                request.endpoint or request.path, times, ' '.join(statement.split())[:300]
+            )
+        
+        total = (time.perf_counter() - g.request_started) * 1000
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries"'
+        )
+        response.headers.add('Server-Timing', f'app;dur={total:.2f}')
+        return response
@@ -5,22 +5,27 @@ import hashlib
 import hmac
 import base64
 from flask import current_app
+from app.services.password_service import PasswordService
 
 def generate_random_string(length: int = 32) -> str:
     """Generate a secure random string"""
     alphabet = string.ascii_letters + string.digits
     return ''.join(secrets.choice(alphabet) for _ in range(length))
 
-def hash_password(password: str) -> str:
-    """Hash a password (alternative to werkzeug)"""
-    salt = generate_random_string(16)
+def _pbkdf2_b64(password: str, salt: str) -> str:
+    """Run the key stretching, kept top-level so the hashing pool can pickle it"""
     hash_obj = hashlib.pbkdf2_hmac(
         'sha256',
         password.encode('utf-8'),
         salt.encode('utf-8'),
         100000
     )
-    hash_b64 = base64.b64encode(hash_obj).decode('utf-8')
+    return base64.b64encode(hash_obj).decode('utf-8')
+
+def hash_password(password: str) -> str:
+    """Hash a password (alternative to werkzeug)"""
+    salt = generate_random_string(16)
+    hash_b64 = PasswordService.run('pbkdf2', _pbkdf2_b64, password, salt)
     return f"{salt}${hash_b64}"
 
 def verify_password_hash(password_hash: str, password: str) -> bool:
@@ -29,13 +34,7 @@ def verify_password_hash(password_hash: str, password: str) -> bool:
         return False
     
     salt, hash_b64 = password_hash.split('$', 1)
-    hash_obj = hashlib.pbkdf2_hmac(
-        'sha256',
-        password.encode('utf-8'),
-        salt.encode('utf-8'),
-        100000
-    )
-    new_hash_b64 = base64.b64encode(hash_obj).decode('utf-8')
+    new_hash_b64 = PasswordService.run('pbkdf2', _pbkdf2_b64, password, salt)
     
     return hmac.compare_digest(hash_b64, new_hash_b64)
 
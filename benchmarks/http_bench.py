@@ -0,0 +1,273 @@
+"""End-to-end HTTP benchmark for the API hot paths.
+
+Builds the app with create_app against a scratch database, seeds N users and
+M activities, serves it on a local port and drives each endpoint from
+concurrent keep-alive clients. Reports throughput, latency percentiles and
+SQL statements per request, and writes a JSON result to diff between commits.
+
+The benchmark drops and recreates all tables in the target database.
+
+Usage: python -m benchmarks.http_bench --database-url URL [--users N] [--activities M]
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import subprocess
+import threading
+import time
+from datetime import datetime, timedelta
+
+PASSWORD = 'BenchPass123'
+
+ACTIONS = ['user_login', 'user_logout', 'profile_updated', 'password_changed', 'user_registered']
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='End-to-end HTTP benchmark for the API hot paths')
+    parser.add_argument('--database-url', help='Scratch database (default: TEST_DATABASE_URL)')
+    parser.add_argument('--users', type=int, default=1000, help='Users to seed')
+    parser.add_argument('--activities', type=int, default=50000, help='Activities to seed')
+    parser.add_argument('--requests', type=int, default=500, help='Requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent client connections')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for data and request mix')
+    parser.add_argument('--output', default='bench_output.json', help='Where to write the JSON result')
+    return parser.parse_args()
+
+class StatementCounter:
+    """Counts SQL statements issued through an engine from any thread"""
+    
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        self._lock = threading.Lock()
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+    
+    def _on_execute(self, *args):
+        with self._lock:
+            self.count += 1
+    
+    def take(self):
+        with self._lock:
+            count, self.count = self.count, 0
+        return count
+
+def seed(db, users, activities, rng):
+    """Recreate the schema and bulk insert users and activities"""
+    from app.models.user import User
+    from app.models.activity import Activity
+    from app.services.password_service import PasswordService
+    
+    db.drop_all()
+    db.create_all()
+    
+    # Hash once: seeding thousands of users must not pay key stretching per row
+    password_hash = PasswordService.hash(PASSWORD)
+    now = datetime.utcnow()
+    
+    rows = [
+        {
+            'id': i,
+            'username': f'bench_user_{i}',
+            'email': f'bench_user_{i}@example.com',
+            'password_hash': password_hash,
+            'role': 'admin' if i == 1 else 'user',
+            'is_active': True,
+            'is_deleted': False,
+            'created_at': now - timedelta(days=rng.randint(0, 365)),
+            'updated_at': now,
+            'token_version': 0
+        }
+        for i in range(1, users + 1)
+    ]
+    for start in range(0, len(rows), 5000):
+        db.session.execute(User.__table__.insert(), rows[start:start + 5000])
+    db.session.commit()
+    
+    batch = []
+    for i in range(activities):
+        batch.append({
+            'user_id': rng.randint(1, users),
+            'action': rng.choice(ACTIONS),
+            'details': 'Seeded by http_bench',
+            'ip_address': f'10.0.{rng.randint(0, 255)}.{rng.randint(1, 254)}',
+            'user_agent': 'http_bench',
+            'timestamp': now - timedelta(seconds=rng.randint(0, 90 * 86400))
+        })
+        if len(batch) == 5000:
+            db.session.execute(Activity.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(Activity.__table__.insert(), batch)
+    db.session.commit()
+
+def start_server(app):
+    """Serve the app from a background thread, returns the port"""
+    from werkzeug.serving import make_server, WSGIRequestHandler
+    
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+    
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, server.server_port
+
+def request(connection, method, path, body=None, token=None):
+    headers = {'Content-Type': 'application/json'}
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    payload = json.dumps(body) if body is not None else None
+    connection.request(method, path, body=payload, headers=headers)
+    response = connection.getresponse()
+    data = response.read()
+    return response.status, data
+
+def login(port, username):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    status, data = request(connection, 'POST', '/auth/login', {'username': username, 'password': PASSWORD})
+    connection.close()
+    if status != 200:
+        raise RuntimeError(f'Login failed for {username}: {status} {data[:200]}')
+    return json.loads(data)
+
+def run_phase(port, counter, make_request, total, concurrency):
+    """Send `total` requests from `concurrency` threads and collect latencies"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    remaining = [total]
+    
+    def worker(worker_id):
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        local = []
+        local_errors = 0
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    break
+                remaining[0] -= 1
+                index = remaining[0]
+            method, path, body, token = make_request(index)
+            started = time.perf_counter()
+            status, _ = request(connection, method, path, body, token)
+            local.append(time.perf_counter() - started)
+            if status >= 400:
+                local_errors += 1
+        connection.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+    
+    counter.take()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    statements = counter.take()
+    
+    latencies.sort()
+    return {
+        'requests': total,
+        'errors': errors[0],
+        'throughput_rps': round(total / elapsed, 2),
+        'latency_ms': {
+            'mean': round(sum(latencies) / len(latencies) * 1000, 3),
+            'p50': round(percentile(latencies, 50) * 1000, 3),
+            'p95': round(percentile(latencies, 95) * 1000, 3),
+            'p99': round(percentile(latencies, 99) * 1000, 3),
+            'max': round(latencies[-1] * 1000, 3)
+        },
+        'sql_per_request': round(statements / total, 2)
+    }
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def main():
+    args = parse_args()
+    if args.database_url:
+        os.environ['TEST_DATABASE_URL'] = args.database_url
+    
+    from app import create_app, db, limiter
+    
+    app = create_app('testing')
+    # Measure the endpoints, not the limiters
+    app.config['RATELIMIT_ENABLED'] = False
+    limiter.enabled = False
+    app.config['DEBUG'] = False
+    rng = random.Random(args.seed)
+    
+    with app.app_context():
+        print(f'Seeding {args.users} users and {args.activities} activities...')
+        seed(db, args.users, args.activities, rng)
+        counter = StatementCounter(db.engine)
+    
+    server, port = start_server(app)
+    
+    # Log in a pool of regular users and the admin up front
+    admin = login(port, 'bench_user_1')
+    sessions = [login(port, f'bench_user_{rng.randint(2, args.users)}') for _ in range(min(20, args.users - 1))]
+    
+    def user_for(index):
+        return sessions[index % len(sessions)]
+    
+    phases = {
+        '/auth/login': lambda i: (
+            'POST', '/auth/login',
+            {'username': f'bench_user_{(i % (args.users - 1)) + 2}', 'password': PASSWORD}, None
+        ),
+        '/auth/refresh': lambda i: (
+            'POST', '/auth/refresh', {'refresh_token': user_for(i)['refresh_token']}, None
+        ),
+        '/user/profile': lambda i: ('GET', '/user/profile', None, user_for(i)['access_token']),
+        '/user/activities': lambda i: ('GET', '/user/activities', None, user_for(i)['access_token']),
+        '/admin/users': lambda i: ('GET', '/admin/users', None, admin['access_token']),
+        '/activity/': lambda i: ('GET', '/activity/', None, admin['access_token'])
+    }
+    
+    results = {}
+    for name, make_request in phases.items():
+        results[name] = run_phase(port, counter, make_request, args.requests, args.concurrency)
+        summary = results[name]
+        print(f"{name:20} {summary['throughput_rps']:>9} req/s  "
+              f"p50 {summary['latency_ms']['p50']:>8} ms  p99 {summary['latency_ms']['p99']:>8} ms  "
+              f"{summary['sql_per_request']:>5} sql/req  {summary['errors']} errors")
+    
+    server.shutdown()
+    
+    output = {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'database': app.config['SQLALCHEMY_DATABASE_URI'].split('@')[-1],
+            'users': args.users,
+            'activities': args.activities,
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'seed': args.seed
+        },
+        'endpoints': results
+    }
+    with open(args.output, 'w') as fh:
+        json.dump(output, fh, indent=2)
+    print(f'Results written to {args.output}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""Compare the cost of turning 1k-row pages of ORM objects into JSON bytes.
+
+Times three stages for activity and user pages: building the dicts (by hand,
+as the services did, against the precompiled RowSerializer), encoding them
+into a response body (Flask's default provider against ORJSONProvider), and
+encoding an NDJSON export chunk (json.dumps per row against dump_lines).
+Rows are built in memory, so no database is needed.
+
+Usage: python -m benchmarks.json_encoding [--rows N] [--repeat N] [--output FILE]
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+ACTIONS = ['user_login', 'user_logout', 'profile_updated', 'password_changed', 'user_registered']
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Compare JSON encode time for 1k-row pages')
+    parser.add_argument('--rows', type=int, default=1000, help='Rows per page')
+    parser.add_argument('--repeat', type=int, default=200, help='Timed runs per case')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for the rows')
+    parser.add_argument('--output', help='Where to write the JSON result')
+    return parser.parse_args()
+
+def make_activities(count, rng):
+    from app.models.activity import Activity
+    
+    start = datetime(2024, 1, 1)
+    return [
+        Activity(
+            id=i, user_id=rng.randint(1, 1000), action=rng.choice(ACTIONS),
+            details='User logged in successfully', ip_address=f'10.0.{rng.randint(0, 255)}.{rng.randint(0, 255)}',
+            user_agent='Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0',
+            timestamp=start + timedelta(seconds=rng.randint(0, 30 * 86400), microseconds=rng.randint(0, 999999))
+        )
+        for i in range(1, count + 1)
+    ]
+
+def make_users(count, rng):
+    from app.models.user import User
+    
+    start = datetime(2023, 1, 1)
+    return [
+        User(
+            id=i, username=f'user{i}', email=f'user{i}@example.com', role='user', is_active=True,
+            created_at=start + timedelta(seconds=rng.randint(0, 365 * 86400)),
+            last_login=start + timedelta(days=400) if i % 3 else None
+        )
+        for i in range(1, count + 1)
+    ]
+
+def legacy_activity_dict(activity):
+    """The hand-written dict the services built per row before RowSerializer"""
+    return {
+        'id': activity.id,
+        'user_id': activity.user_id,
+        'action': activity.action,
+        'details': activity.details,
+        'ip_address': activity.ip_address,
+        'user_agent': activity.user_agent,
+        'timestamp': activity.timestamp.isoformat()
+    }
+
+def legacy_user_dict(user):
+    return {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'role': user.role,
+        'is_active': user.is_active,
+        'created_at': user.created_at.isoformat(),
+        'last_login': user.last_login.isoformat() if user.last_login else None
+    }
+
+def measure(fn, repeat):
+    """Median and p95 wall time of fn in milliseconds, after a warm-up run"""
+    fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {'median_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(timings[int(len(timings) * 0.95) - 1], 3)}
+
+def main():
+    args = parse_args()
+    
+    from flask.json.provider import DefaultJSONProvider
+    from app import create_app
+    from app.services.activity_service import ActivityService
+    from app.services.user_service import UserService
+    from app.utils.json_provider import ORJSONProvider, orjson
+    
+    if orjson is None:
+        raise SystemExit('orjson is not installed: pip install -r requirements.txt')
+    
+    app = create_app('testing')
+    default_provider = DefaultJSONProvider(app)
+    fast_provider = ORJSONProvider(app)
+    
+    rng = random.Random(args.seed)
+    activities = make_activities(args.rows, rng)
+    users = make_users(args.rows, rng)
+    
+    def page(provider, build):
+        return lambda: provider.response({'activities': build(), 'next_cursor': 'eyJpZCI6MX0'}).get_data()
+    
+    legacy_activities = lambda: [legacy_activity_dict(activity) for activity in activities]
+    compiled_activities = lambda: ActivityService.ACTIVITY_SERIALIZER.to_dicts(activities)
+    legacy_users = lambda: [legacy_user_dict(user) for user in users]
+    compiled_users = lambda: UserService.ADMIN_USER_SERIALIZER.to_dicts(users)
+    
+    cases = [
+        ('activity dicts: hand-written', legacy_activities),
+        ('activity dicts: RowSerializer', compiled_activities),
+        ('activity page: hand-written + default provider', page(default_provider, legacy_activities)),
+        ('activity page: RowSerializer + default provider', page(default_provider, compiled_activities)),
+        ('activity page: RowSerializer + ORJSONProvider', page(fast_provider, compiled_activities)),
+        ('user page: hand-written + default provider', page(default_provider, legacy_users)),
+        ('user page: RowSerializer + ORJSONProvider', page(fast_provider, compiled_users)),
+        ('ndjson chunk: json.dumps per row',
+         lambda: ('\n'.join(json.dumps(legacy_activity_dict(activity)) for activity in activities) + '\n').encode()),
+        ('ndjson chunk: RowSerializer.dump_lines', lambda: ActivityService.ACTIVITY_SERIALIZER.dump_lines(activities)),
+    ]
+    
+    # Both providers must produce the same document
+    legacy_body = json.loads(page(default_provider, legacy_activities)())
+    assert json.loads(page(fast_provider, compiled_activities)()) == legacy_body
+    assert json.loads(page(fast_provider, compiled_users)()) == json.loads(page(default_provider, legacy_users)())
+    
+    results = {}
+    width = max(len(name) for name, _ in cases)
+    print(f'{args.rows} rows per page, {args.repeat} runs each')
+    for name, fn in cases:
+        results[name] = measure(fn, args.repeat)
+        print(f"{name:<{width}}  median {results[name]['median_ms']:8.3f} ms  p95 {results[name]['p95_ms']:8.3f} ms")
+    
+    baseline = results['activity page: hand-written + default provider']['median_ms']
+    fastest = results['activity page: RowSerializer + ORJSONProvider']['median_ms']
+    print(f'activity page speedup: {baseline / fastest:.1f}x')
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'rows': args.rows, 'repeat': args.repeat, 'orjson': orjson.__version__,
+                       'results': results}, f, indent=2)
+        print(f'Wrote {args.output}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""Compare ORM objects against Core column rows for the list endpoint reads.
+
+For the admin user list and the activity list, loads pages of each size the
+old way (Model.query, full ORM instances in the identity map) and the new way
+(the repository's Core select of LIST_COLUMNS), serializes them with the
+services' RowSerializer and reports rows/sec. Peak RSS is measured in a
+fresh worker process per case, as the growth of the process's peak RSS
+while one page is loaded and serialized. The old path is timed without
+the COUNT query paginate() also issued, so only materialization differs.
+
+Seed the database first with flask db upgrade and
+python -m database.run_seed --synthetic; an empty or small database is seeded
+here with the synthetic generator.
+
+Usage: python -m benchmarks.list_read_models [--database-url URL] [--page-sizes 100,1000,10000]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Compare ORM objects against Core rows for list reads')
+    parser.add_argument('--database-url', help='Seeded database to read from (default: TEST_DATABASE_URL)')
+    parser.add_argument('--page-sizes', default='100,1000,10000', help='Comma-separated rows per page')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed page loads per case')
+    parser.add_argument('--users', type=int, default=20000, help='Users to generate if the database is small')
+    parser.add_argument('--activities', type=int, default=200000,
+                        help='Activities to generate if the database is small')
+    parser.add_argument('--output', help='Where to write the JSON result')
+    parser.add_argument('--worker', nargs=3, metavar=('ENDPOINT', 'MODE', 'ROWS'), help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+def orm_users(per_page):
+    """The admin user list read as it was: full User instances"""
+    from app.models.user import User
+    return User.query.order_by(User.id).limit(per_page).all()
+
+def orm_activities(per_page):
+    """The activity list read as it was: full Activity instances"""
+    from app.models.activity import Activity
+    return Activity.query.order_by(Activity.timestamp.desc(), Activity.id.desc()).limit(per_page).all()
+
+def load_page(endpoint, mode, per_page):
+    """Read one page and serialize it the way the service does"""
+    from app.repositories.activity_repository import ActivityRepository
+    from app.repositories.user_repository import UserRepository
+    from app.services.activity_service import ActivityService
+    from app.services.user_service import UserService
+    
+    if endpoint == 'users':
+        rows = orm_users(per_page) if mode == 'orm' else UserRepository.get_all(1, per_page)
+        return rows, UserService.ADMIN_USER_SERIALIZER.to_dicts(rows)
+    rows = orm_activities(per_page) if mode == 'orm' else ActivityRepository.get_all(1, per_page)
+    return rows, ActivityService.ACTIVITY_SERIALIZER.to_dicts(rows)
+
+def max_rss_kb():
+    """Peak RSS of this process in KB"""
+    # ru_maxrss survives fork and exec on Linux, so a worker would start at
+    # its parent's peak; VmHWM belongs to this process's address space
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+def run_worker(app, db, endpoint, mode, per_page):
+    """Report the peak RSS growth of loading one page, from a fresh process"""
+    with app.test_request_context():
+        # Warm the statement caches and mapper configuration first
+        load_page(endpoint, mode, 1)
+        db.session.remove()
+        
+        before = max_rss_kb()
+        rows, page = load_page(endpoint, mode, per_page)
+        after = max_rss_kb()
+        print(json.dumps({'rows': len(rows), 'rss_growth_kb': after - before, 'peak_rss_kb': after}))
+        db.session.remove()
+
+def measure_throughput(app, db, endpoint, mode, per_page, repeat):
+    with app.test_request_context():
+        load_page(endpoint, mode, per_page)
+        db.session.remove()
+        
+        rows = 0
+        elapsed = 0.0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            page, _ = load_page(endpoint, mode, per_page)
+            elapsed += time.perf_counter() - start
+            rows += len(page)
+            # A new request gets a new session, and an empty identity map
+            db.session.remove()
+    return rows / elapsed if elapsed else 0.0
+
+def measure_rss(endpoint, mode, per_page):
+    command = [sys.executable, '-m', 'benchmarks.list_read_models', '--worker', endpoint, mode, str(per_page)]
+    output = subprocess.run(command, check=True, capture_output=True, text=True, env=os.environ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    args = parse_args()
+    if args.database_url:
+        os.environ['TEST_DATABASE_URL'] = args.database_url
+    
+    from app import create_app, db
+    
+    app = create_app('testing')
+    if args.worker:
+        endpoint, mode, per_page = args.worker
+        run_worker(app, db, endpoint, mode, int(per_page))
+        return
+    
+    from benchmarks.query_plans import ensure_seeded
+    with app.app_context():
+        db.create_all()
+        ensure_seeded(db, args.users, args.activities, 10000)
+        database = db.engine.url.render_as_string(hide_password=True)
+        db.session.remove()
+    
+    page_sizes = [int(size) for size in args.page_sizes.split(',')]
+    results = []
+    print(f"{'endpoint':<11}{'rows':>7}  {'orm rows/s':>11}  {'core rows/s':>11}  {'speedup':>7}  "
+          f"{'orm RSS growth':>14}  {'core RSS growth':>15}")
+    for endpoint in ('users', 'activities'):
+        for per_page in page_sizes:
+            result = {'endpoint': endpoint, 'per_page': per_page}
+            for mode in ('orm', 'core'):
+                result[f'{mode}_rows_per_sec'] = round(measure_throughput(app, db, endpoint, mode, per_page,
+                                                                          args.repeat))
+                result[f'{mode}_rss_growth_kb'] = measure_rss(endpoint, mode, per_page)['rss_growth_kb']
+            results.append(result)
+            speedup = result['core_rows_per_sec'] / result['orm_rows_per_sec'] if result['orm_rows_per_sec'] else 0
+            print(f"{endpoint:<11}{per_page:>7}  {result['orm_rows_per_sec']:>11,}  "
+                  f"{result['core_rows_per_sec']:>11,}  {speedup:>6.1f}x  "
+                  f"{result['orm_rss_growth_kb']:>11,} KB  {result['core_rss_growth_kb']:>12,} KB")
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'database': database, 'results': results}, f, indent=2)
+        print(f'Wrote {args.output}')
+
+if __name__ == '__main__':
+    main()
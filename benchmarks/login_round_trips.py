@@ -0,0 +1,113 @@
+"""Count database round trips per login, before and after the single-query login path.
+
+Usage: python -m benchmarks.login_round_trips [--database-url URL] [--logins N]
+"""
+import argparse
+import json
+import os
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', help='Database to run against (default: TEST_DATABASE_URL)')
+    parser.add_argument('--logins', type=int, default=20, help='Logins per scenario')
+    return parser.parse_args()
+
+class RoundTripCounter:
+    """Counts statements and commits issued through an engine"""
+    
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.statements = 0
+        self.commits = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+        event.listen(engine, 'commit', self._on_commit)
+    
+    def _on_execute(self, *args):
+        self.statements += 1
+    
+    def _on_commit(self, *args):
+        self.commits += 1
+    
+    def reset(self):
+        self.statements = 0
+        self.commits = 0
+    
+    @property
+    def round_trips(self):
+        return self.statements + self.commits
+
+def legacy_login(identifier, password):
+    """The login sequence as it was before: two lookups and two commits"""
+    from flask import request
+    from app.repositories.user_repository import UserRepository
+    from app.services.activity_service import ActivityService
+    from app.services.token_service import TokenService
+    
+    user = UserRepository.get_by_username(identifier)
+    if not user:
+        user = UserRepository.get_by_email(identifier)
+    user.verify_password(password)
+    UserRepository.update_last_login(user)
+    TokenService.generate_access_token(user.id, user.role, user.token_version)
+    TokenService.generate_refresh_token(user.id)
+    ActivityService.log_activity(user.id, 'user_login', 'User logged in successfully', request=request)
+    return {'id': user.id, 'username': user.username, 'email': user.email, 'role': user.role}
+
+def current_login(identifier, password):
+    from app.services.auth_service import AuthService
+    result, status_code = AuthService.login({'username': identifier, 'password': password})
+    assert status_code == 200, result
+    return result['user']
+
+def measure(app, counter, login, identifier, password, logins):
+    from app import db
+    from app.services.cache_service import CacheService
+    
+    samples = []
+    for _ in range(logins):
+        with app.test_request_context('/auth/login', method='POST'):
+            CacheService.clear()
+            counter.reset()
+            login(identifier, password)
+            samples.append({'statements': counter.statements, 'commits': counter.commits})
+            db.session.remove()
+    
+    return {
+        'statements': sum(s['statements'] for s in samples) / len(samples),
+        'commits': sum(s['commits'] for s in samples) / len(samples),
+        'round_trips': sum(s['statements'] + s['commits'] for s in samples) / len(samples)
+    }
+
+def main():
+    args = parse_args()
+    if args.database_url:
+        os.environ['TEST_DATABASE_URL'] = args.database_url
+    
+    from app import create_app, db
+    from app.repositories.user_repository import UserRepository
+    
+    app = create_app('testing')
+    app.config['ACTIVITY_LOG_MODE'] = 'sync'
+    app.config['PASSWORD_HASH_WORKERS'] = 0
+    
+    with app.app_context():
+        db.create_all()
+        if not UserRepository.get_by_username('bench_login'):
+            UserRepository.create({
+                'username': 'bench_login',
+                'email': 'bench_login@example.com',
+                'password': 'BenchPass123'
+            })
+        counter = RoundTripCounter(db.engine)
+    
+    results = {}
+    for name, login in (('before', legacy_login), ('after', current_login)):
+        results[name] = {
+            'by_username': measure(app, counter, login, 'bench_login', 'BenchPass123', args.logins),
+            'by_email': measure(app, counter, login, 'bench_login@example.com', 'BenchPass123', args.logins)
+        }
+    
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
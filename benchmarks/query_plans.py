@@ -0,0 +1,276 @@
+"""Check the query plans of the repository read paths against accepted plans.
+
+Runs each repository method against a seeded database, captures the SQL it
+emits with QueryCounter.capture() and runs EXPLAIN (EXPLAIN QUERY PLAN on
+SQLite) on every SELECT. A case fails when a plan does a full table or index
+scan, a filesort or a temporary table on a large table, or when its plan
+differs from the one stored in benchmarks/query_plans.json. Run with
+--update after an intended change and commit the JSON so the plan change
+shows up in review.
+
+Seed the database first with flask db upgrade and
+python -m database.run_seed --synthetic; an empty or small database is seeded
+here with the synthetic generator. Plans are stored per dialect: check
+against MySQL before accepting plans for production.
+
+Usage: python -m benchmarks.query_plans [--database-url URL] [--update] [--large-rows N]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from itertools import islice
+
+ACCEPTED_PATH = os.path.join(os.path.dirname(__file__), 'query_plans.json')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Check repository query plans against accepted plans')
+    parser.add_argument('--database-url', help='Seeded database to explain against (default: TEST_DATABASE_URL)')
+    parser.add_argument('--accepted', default=ACCEPTED_PATH, help='Accepted plans JSON')
+    parser.add_argument('--update', action='store_true', help='Store the current plans as accepted')
+    parser.add_argument('--large-rows', type=int, default=10000,
+                        help='Tables with at least this many rows must not be scanned')
+    parser.add_argument('--users', type=int, default=20000, help='Users to generate if the database is small')
+    parser.add_argument('--activities', type=int, default=200000,
+                        help='Activities to generate if the database is small')
+    return parser.parse_args()
+
+def ensure_seeded(db, users, activities, large_rows):
+    """Generate synthetic rows unless the activities table is already large"""
+    from sqlalchemy import func, select
+    from app.models.activity import Activity
+    from database.synthetic import SyntheticGenerator
+    
+    if db.session.execute(select(func.count()).select_from(Activity)).scalar() >= large_rows:
+        return
+    
+    print(f'Seeding {users} users and {activities} activities')
+    SyntheticGenerator(users, activities).run()
+    
+    # The planner needs fresh statistics to pick the plans production would get
+    with db.engine.begin() as connection:
+        if connection.dialect.name == 'mysql':
+            connection.exec_driver_sql('ANALYZE TABLE users, activities')
+        else:
+            connection.exec_driver_sql('ANALYZE')
+
+def table_sizes(db):
+    from sqlalchemy import func, inspect, select, table
+    
+    sizes = {}
+    for name in inspect(db.engine).get_table_names():
+        if name != 'alembic_version':
+            sizes[name] = db.session.execute(select(func.count()).select_from(table(name))).scalar()
+    return sizes
+
+def sample_arguments(db):
+    """Pick realistic arguments: a busy user and cursors from the middle of the tables"""
+    from sqlalchemy import func, select
+    from app.models.activity import Activity
+    from app.models.user import User
+    from app.utils.pagination import encode_cursor
+    
+    user_id = db.session.execute(
+        select(Activity.user_id).group_by(Activity.user_id).order_by(func.count().desc()).limit(1)
+    ).scalar()
+    user = db.session.get(User, user_id)
+    middle = db.session.execute(
+        select(Activity.id, Activity.timestamp).order_by(Activity.timestamp, Activity.id)
+        .offset(db.session.execute(select(func.count()).select_from(Activity)).scalar() // 2).limit(1)
+    ).one()
+    
+    return {
+        'user_id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'user_cursor': encode_cursor({'id': user.id}),
+        'activity_id': middle.id,
+        'since': middle.timestamp,
+        'activity_cursor': encode_cursor({'ts': middle.timestamp.isoformat(), 'id': middle.id})
+    }
+
+def first_rows(rows, count=10):
+    """Start a streaming query, read a few rows and close it"""
+    fetched = list(islice(rows, count))
+    rows.close()
+    return fetched
+
+def cases(sample):
+    """Repository calls whose queries must stay index-driven"""
+    from datetime import datetime
+    from app.repositories.activity_repository import ActivityRepository
+    from app.repositories.activity_stats_repository import ActivityStatsRepository
+    from app.repositories.user_repository import UserRepository
+    
+    return [
+        ('UserRepository.get_by_id', lambda: UserRepository.get_by_id(sample['user_id'])),
+        ('UserRepository.get_by_username_or_email',
+         lambda: UserRepository.get_by_username_or_email(sample['email'])),
+        ('UserRepository.get_by_username', lambda: UserRepository.get_by_username(sample['username'])),
+        ('UserRepository.get_by_email', lambda: UserRepository.get_by_email(sample['email'])),
+        ('UserRepository.get_all', lambda: UserRepository.get_all(page=50)),
+        ('UserRepository.get_all_after', lambda: UserRepository.get_all_after(sample['user_cursor'])),
+        ('UserRepository.get_taken_identities',
+         lambda: UserRepository.get_taken_identities([sample['username']], [sample['email']])),
+        ('UserRepository.get_existing_ids',
+         lambda: UserRepository.get_existing_ids([sample['user_id'], sample['user_id'] + 1])),
+        ('ActivityRepository.get_by_id', lambda: ActivityRepository.get_by_id(sample['activity_id'])),
+        ('ActivityRepository.get_by_user_id', lambda: ActivityRepository.get_by_user_id(sample['user_id'], page=2)),
+        ('ActivityRepository.get_by_user_id_after',
+         lambda: ActivityRepository.get_by_user_id_after(sample['user_id'], sample['activity_cursor'])),
+        ('ActivityRepository.get_all', lambda: ActivityRepository.get_all(page=50)),
+        ('ActivityRepository.get_all_after', lambda: ActivityRepository.get_all_after(sample['activity_cursor'])),
+        ('ActivityRepository.stream_for_export', lambda: first_rows(ActivityRepository.stream_for_export())),
+        ('ActivityRepository.stream_for_export[user_id,since]',
+         lambda: first_rows(ActivityRepository.stream_for_export(sample['user_id'], since=sample['since']))),
+        ('ActivityStatsRepository.get_pending_range',
+         lambda: ActivityStatsRepository.get_pending_range(datetime.utcnow())),
+        ('ActivityStatsRepository.get_counts',
+         lambda: ActivityStatsRepository.get_counts(since=sample['since'].date(), actions=['user_login']))
+    ]
+
+def explain(connection, statement, parameters):
+    """Get a normalized plan as a list of steps, one per table access or sort"""
+    if connection.dialect.name == 'mysql':
+        rows = connection.exec_driver_sql('EXPLAIN ' + statement, parameters).mappings().all()
+        return [
+            {'table': row['table'], 'access': row['type'], 'key': row['key'],
+             'rows': row['rows'], 'extra': row['Extra']}
+            for row in rows
+        ]
+    
+    rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).all()
+    return [{'detail': row[3]} for row in rows]
+
+def stable(plan):
+    """Drop the row estimates, which change with every ANALYZE"""
+    return [{key: value for key, value in step.items() if key != 'rows'} for step in plan]
+
+def problems(plan, statement, large_tables, large_rows):
+    """Full scans, filesorts and temporary tables that touch a large table"""
+    found = []
+    if plan and 'detail' in plan[0]:
+        # SQLite gives no row estimates. SCAN walks the table or an index in
+        # order, which only stops early under a LIMIT with no sort step
+        sorted_in_temp = any(step['detail'].startswith('USE TEMP B-TREE') for step in plan)
+        bounded = re.search(r'\bLIMIT\b', statement, re.IGNORECASE) and not sorted_in_temp
+        touches_large = False
+        for step in plan:
+            words = step['detail'].split()
+            if words[0] in ('SCAN', 'SEARCH') and len(words) > 1 and words[1] in large_tables:
+                touches_large = True
+                if words[0] == 'SCAN' and not bounded:
+                    found.append(f"full scan: {step['detail']}")
+        if sorted_in_temp and touches_large:
+            found.extend(f"sort: {step['detail']}" for step in plan if step['detail'].startswith('USE TEMP B-TREE'))
+        return found
+    
+    for step in plan:
+        if step['table'] not in large_tables:
+            continue
+        # An index walk cut short by LIMIT shows as type index with a small estimate
+        if step['access'] in ('ALL', 'index') and (step['rows'] or 0) >= large_rows:
+            found.append(f"full {'table' if step['access'] == 'ALL' else 'index'} scan of {step['table']}")
+        extra = step['extra'] or ''
+        for marker in ('Using filesort', 'Using temporary'):
+            if marker in extra:
+                found.append(f"{marker.lower()} on {step['table']}")
+    return found
+
+def run_case(app, db, call, large_tables, large_rows):
+    from app.utils.query_counter import QueryCounter
+    
+    with app.test_request_context():
+        with QueryCounter.capture() as stats:
+            call()
+        db.session.rollback()
+        
+        results = []
+        seen = set()
+        with db.engine.connect() as connection:
+            for statement, parameters in stats.statements:
+                if not statement.lstrip().upper().startswith('SELECT') or statement in seen:
+                    continue
+                seen.add(statement)
+                plan = explain(connection, statement, parameters)
+                results.append({
+                    'sql': ' '.join(statement.split()),
+                    'plan': stable(plan),
+                    'problems': problems(plan, statement, large_tables, large_rows)
+                })
+        db.session.remove()
+    return results
+
+def main():
+    args = parse_args()
+    if args.database_url:
+        os.environ['TEST_DATABASE_URL'] = args.database_url
+    
+    from app import create_app, db
+    
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        ensure_seeded(db, args.users, args.activities, args.large_rows)
+        sizes = table_sizes(db)
+        sample = sample_arguments(db)
+        dialect = db.engine.dialect.name
+        db.session.remove()
+    
+    large_tables = {name for name, rows in sizes.items() if rows >= args.large_rows}
+    print(f"{dialect}; large tables: {', '.join(sorted(large_tables)) or 'none'}")
+    
+    accepted = {}
+    if os.path.exists(args.accepted):
+        with open(args.accepted) as f:
+            accepted = json.load(f)
+    accepted_cases = accepted.get(dialect, {})
+    # With no plans recorded for this dialect yet, still gate on full scans,
+    # filesorts and temporary tables rather than failing every case
+    has_baseline = any(entry.get('statements') is not None for entry in accepted_cases.values())
+    if not has_baseline and not args.update:
+        print(f'No accepted {dialect} plans: checking for scans and sorts only. Run with --update '
+              f'against a seeded {dialect} database and commit the reviewed plans.')
+    
+    current = {}
+    failures = 0
+    with app.app_context():
+        for name, call in cases(sample):
+            statements = run_case(app, db, call, large_tables, args.large_rows)
+            entry = accepted_cases.get(name, {})
+            # A reviewed exception, e.g. the COUNT behind OFFSET pagination
+            allowed = entry.get('allow')
+            current[name] = {'statements': [{'sql': s['sql'], 'plan': s['plan']} for s in statements]}
+            if allowed:
+                current[name]['allow'] = allowed
+            
+            issues = [issue for s in statements for issue in s['problems']] if not allowed else []
+            if not args.update and entry.get('statements') is not None:
+                if [s['plan'] for s in statements] != [s['plan'] for s in entry['statements']]:
+                    issues.append('plan differs from the accepted plan')
+            elif not args.update and has_baseline:
+                issues.append('no accepted plan, run with --update and review the diff')
+            
+            print(f"{'FAIL' if issues else 'ok  '} {name}")
+            for issue in issues:
+                print(f'       {issue}')
+            if issues:
+                failures += 1
+                for s in statements:
+                    print(f"       {s['sql'][:200]}")
+                    for step in s['plan']:
+                        print(f'         {step}')
+    
+    if args.update:
+        accepted[dialect] = current
+        with open(args.accepted, 'w') as f:
+            json.dump(accepted, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'Stored {len(current)} accepted {dialect} plans in {args.accepted}')
+    
+    print(f'{failures} of {len(current)} cases failed')
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 import os
+import redis
 from datetime import timedelta
 
 class Config:
@@ -14,15 +15,107 @@ class Config:
     PERMANENT_SESSION_LIFETIME = timedelta(days=7)
     CACHE_TYPE = 'SimpleCache'
     CACHE_DEFAULT_TIMEOUT = 300
+    # In-process LRU in front of CACHE_TYPE; with a shared cache it needs the
+    # pub/sub invalidation bus, or other workers would serve overwritten values
+    CACHE_LOCAL_ENABLED = os.getenv('CACHE_LOCAL_ENABLED', 'true').lower() == 'true'
+    CACHE_LOCAL_MAX_ENTRIES = 10000
+    CACHE_LOCAL_MAX_BYTES = 32 * 1024 * 1024
+    CACHE_LOCAL_TTL = 30  # seconds, caps staleness if a broadcast is lost
+    CACHE_INVALIDATION_REDIS_URL = os.getenv('CACHE_INVALIDATION_REDIS_URL')
+    CACHE_INVALIDATION_CHANNEL = 'cache-invalidation'
+    CACHE_LOAD_WAIT = 2.0  # seconds a miss waits for another request loading the same key
+    CACHE_NEGATIVE_TTL = 5  # seconds a lookup that found nothing is remembered, 0 to disable
+    # Per-process Bloom filter of usernames and emails: definite misses skip the
+    # database in registration and /auth/availability. New names reach other
+    # processes over CACHE_INVALIDATION_REDIS_URL; without it, up to
+    # BLOOM_REBUILD_INTERVAL late
+    BLOOM_ENABLED = os.getenv('BLOOM_ENABLED', 'true').lower() == 'true'
+    BLOOM_ERROR_RATE = 0.01
+    BLOOM_REBUILD_INTERVAL = 120  # seconds; catches up on users whose broadcast was missed
+    # 'orjson' encodes API responses with orjson (falls back to the standard
+    # library when it is not installed), 'default' keeps Flask's encoder
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'orjson')
     RATELIMIT_DEFAULT = "200 per day, 50 per hour"
-    RATELIMIT_STORAGE_URL = "memory://"
+    RATELIMIT_STORAGE_URI = os.getenv('RATELIMIT_STORAGE_URI', 'memory://')
     RATELIMIT_STRATEGY = "fixed-window"
+    # rate_limit decorator: 'memory' is per process, 'redis' is shared by all workers
+    RATELIMIT_BACKEND = os.getenv('RATELIMIT_BACKEND', 'memory')
+    RATELIMIT_REDIS_URL = os.getenv('RATELIMIT_REDIS_URL', os.getenv('REDIS_URL'))
+    RATELIMIT_LOCAL_BATCH = 1  # tokens leased per backend call, spent locally
+    RATELIMIT_LOCAL_TTL = 1.0  # seconds a leased batch or cached denial is kept
+    RATELIMIT_LOCAL_MIN_LIMIT = 100  # smaller limits take one token per backend call
+    # Reverse proxies in front of the app whose X-Forwarded-For/-Proto/-Host
+    # headers are trusted; 0 uses the socket address as the client IP
+    PROXY_FIX_HOPS = int(os.getenv('PROXY_FIX_HOPS', 0))
+    # Activity logging: 'sync' inserts inside the request, 'async' queues rows
+    # for a background writer that flushes them in multi-row INSERTs
+    ACTIVITY_LOG_MODE = os.getenv('ACTIVITY_LOG_MODE', 'sync')
+    ACTIVITY_QUEUE_SIZE = 10000
+    ACTIVITY_BATCH_SIZE = 500
+    ACTIVITY_FLUSH_INTERVAL = 1.0  # seconds
+    ACTIVITY_ENQUEUE_TIMEOUT = 0.05  # seconds a request may block on a full queue
+    ACTIVITY_SHUTDOWN_TIMEOUT = 10.0  # seconds allowed to drain on shutdown
+    ACTIVITY_EXPORT_BATCH_SIZE = 1000  # rows fetched and sent per chunk by /activity/export
+    # Monthly activities partitions on MySQL, see database/partition_maintenance.py
+    ACTIVITY_RETENTION_MONTHS = int(os.getenv('ACTIVITY_RETENTION_MONTHS', 12))
+    ACTIVITY_PARTITION_MONTHS_AHEAD = 3
+    # Daily activity rollups behind /activity/stats, see database/rollup_activities.py
+    ACTIVITY_STATS_LAG_SECONDS = 60  # rollups skip activities younger than this
+    ACTIVITY_STATS_CHUNK_IDS = 50000  # activity ids folded per rollup transaction
+    ACTIVITY_STATS_PER_USER = os.getenv('ACTIVITY_STATS_PER_USER', 'false').lower() == 'true'
+    USER_CACHE_TTL = 60  # seconds a user snapshot may be served from cache
+    # Admin user listings are invalidated by tag on every write; the TTL only
+    # bounds how long unused entries take up cache memory
+    ADMIN_CACHE_TTL = 600
+    BULK_MAX_USERS = 1000  # ids accepted by POST /admin/users/bulk
+    IMPORT_CHUNK_SIZE = 1000  # rows validated, hashed and inserted together
+    IMPORT_MAX_ERRORS = 1000  # row errors kept in an import report
+    # Authorization: 'database' checks the user's role on each call, 'claims'
+    # trusts the permission bitmask signed into the access token
+    AUTHZ_MODE = os.getenv('AUTHZ_MODE', 'database')
+    # Raw SQL access through database/db.py
+    DB_HOST = os.getenv('DB_HOST', 'localhost')
+    DB_USER = os.getenv('DB_USER', 'root')
+    DB_PASSWORD = os.getenv('DB_PASSWORD', '')
+    DB_NAME = os.getenv('DB_NAME', 'flask_app_dev')
+    DB_POOL_MIN_SIZE = 1
+    DB_POOL_MAX_SIZE = 10
+    DB_POOL_RECYCLE = 3600  # seconds before a connection is replaced
+    DB_POOL_MAX_IDLE = 300  # seconds an idle connection is kept above min size
+    DB_POOL_PRE_PING = True
+    DB_POOL_TIMEOUT = 10.0  # seconds to wait for a free connection
+    # Password hashing: werkzeug method string, and a process pool per worker
+    # (0 workers hashes inline on the request thread)
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 0))
+    PASSWORD_HASH_QUEUE_DEPTH = 32  # callers allowed to wait for a busy pool
+    PASSWORD_HASH_QUEUE_TIMEOUT = 2.0  # seconds to wait before answering 503
+    # Draw raw connections from the SQLAlchemy engine pool instead of a separate one;
+    # the DBAPI then follows SQLALCHEMY_DATABASE_URI, so use a mysql+pymysql:// URI
+    # for raw connections to behave like the PyMySQL pool's (a plain mysql:// URI
+    # loads mysqlclient)
+    DB_POOL_USE_ENGINE = os.getenv('DB_POOL_USE_ENGINE', 'false').lower() == 'true'
+    # Per-request SQL counting: Server-Timing header and N+1 warnings
+    SQL_INSTRUMENTATION = os.getenv('SQL_INSTRUMENTATION', 'false').lower() == 'true'
+    SQL_N_PLUS_ONE_THRESHOLD = 3  # identical statements in one request before warning
+    # Prometheus metrics on /metrics; with several gunicorn workers set
+    # PROMETHEUS_MULTIPROC_DIR (gunicorn.conf.py does) so samples are shared
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    # /metrics exposes per-endpoint traffic and pool internals, so scrapers must
+    # send "Authorization: Bearer <METRICS_TOKEN>"; without a token it is only
+    # served in debug and testing, and answers 404 otherwise
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+    # /health/ready: probes share one result for HEALTH_CACHE_TTL seconds
+    HEALTH_CACHE_TTL = 2.0
+    HEALTH_PROBE_TIMEOUT = 1.0  # seconds before a probe counts as failed
+    HEALTH_CHECK_RAW_DB = os.getenv('HEALTH_CHECK_RAW_DB', 'false').lower() == 'true'
 
 class DevelopmentConfig(Config):
     """Development config."""
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = os.getenv('DEV_DATABASE_URL', 'mysql://root:@localhost/flask_app_dev')
     CACHE_TYPE = 'SimpleCache'
+    SQL_INSTRUMENTATION = os.getenv('SQL_INSTRUMENTATION', 'true').lower() == 'true'
 
 class TestingConfig(Config):
     """Testing config."""
@@ -31,6 +124,7 @@ class TestingConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.getenv('TEST_DATABASE_URL', 'mysql://root:@localhost/flask_app_test')
     PRESERVE_CONTEXT_ON_EXCEPTION = False
     WTF_CSRF_ENABLED = False
+    SQL_INSTRUMENTATION = True
 
 class ProductionConfig(Config):
     """Production config."""
@@ -38,9 +132,18 @@ class ProductionConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
     CACHE_TYPE = 'RedisCache'
     CACHE_REDIS_URL = os.getenv('REDIS_URL')
+    CACHE_INVALIDATION_REDIS_URL = os.getenv('CACHE_INVALIDATION_REDIS_URL', os.getenv('REDIS_URL'))
     SESSION_TYPE = 'redis'
-    SESSION_REDIS = os.getenv('REDIS_URL')
+    # Flask-Session wants a client, not a URL
+    SESSION_REDIS = redis.from_url(os.getenv('REDIS_URL')) if os.getenv('REDIS_URL') else None
     WTF_CSRF_ENABLED = True
+    RATELIMIT_STORAGE_URI = os.getenv('RATELIMIT_STORAGE_URI', os.getenv('REDIS_URL', 'memory://'))
+    RATELIMIT_BACKEND = os.getenv('RATELIMIT_BACKEND', 'redis')
+    RATELIMIT_LOCAL_BATCH = 5
+    PROXY_FIX_HOPS = int(os.getenv('PROXY_FIX_HOPS', 1))  # the load balancer
+    ACTIVITY_LOG_MODE = os.getenv('ACTIVITY_LOG_MODE', 'async')
+    AUTHZ_MODE = os.getenv('AUTHZ_MODE', 'claims')
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
 
 config = {
     'development': DevelopmentConfig,
@@ -1,20 +1,249 @@
 from app import db
 from flask import current_app
+from collections import deque
+from contextlib import closing
 import pymysql
 import logging
+import os
+import threading
+import time
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection became available in time"""
+    pass
+
+class PooledConnection:
+    """Pooled PyMySQL connection, close() hands it back to the pool"""
+
+    def __init__(self, pool, connection, created_at):
+        self._pool = pool
+        self._connection = connection
+        self._created_at = created_at
+        self._invalid = False
+
+    def invalidate(self):
+        """Mark the connection as broken so it is discarded on close"""
+        self._invalid = True
+
+    def close(self):
+        """Return the connection to the pool"""
+        if self._connection is None:
+            return
+
+        self._pool._release(self._connection, self._created_at, discard=self._invalid)
+        self._connection = None
+
+    def __getattr__(self, name):
+        if self._connection is None:
+            raise pymysql.err.InterfaceError('Connection already returned to the pool')
+        return getattr(self._connection, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class ConnectionPool:
+    """Thread-safe pool of raw PyMySQL connections"""
+
+    def __init__(self, connect_args, min_size=1, max_size=10, recycle=3600,
+                 max_idle=300, pre_ping=True, timeout=10.0):
+        self.connect_args = connect_args
+        self.min_size = min_size
+        self.max_size = max_size
+        self.recycle = recycle
+        self.max_idle = max_idle
+        self.pre_ping = pre_ping
+        self.timeout = timeout
+        self.pid = os.getpid()
+
+        # Idle connections as (connection, created_at, returned_at), newest last
+        self._idle = deque()
+        self._size = 0
+        self._cond = threading.Condition()
+        self._metrics = {
+            'checkouts': 0,
+            'connects': 0,
+            'recycled': 0,
+            'ping_failures': 0,
+            'timeouts': 0,
+            'wait_time': 0.0
+        }
+
+    def connect(self) -> PooledConnection:
+        """Check out a connection, waiting up to the pool timeout"""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        entry = None
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    entry = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    # Reserve a slot, the connection is opened outside the lock
+                    self._size += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._metrics['timeouts'] += 1
+                    raise PoolTimeoutError(
+                        f'No connection available within {self.timeout}s (max_size={self.max_size})'
+                    )
+                self._cond.wait(remaining)
+
+            self._metrics['checkouts'] += 1
+            self._metrics['wait_time'] += time.monotonic() - started
+
+        try:
+            if entry is not None:
+                connection, created_at = self._check(entry)
+            else:
+                connection, created_at = self._open(), time.monotonic()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        return PooledConnection(self, connection, created_at)
+
+    def status(self):
+        """Get pool sizing and counters"""
+        with self._cond:
+            status = dict(self._metrics)
+            status.update({
+                'size': self._size,
+                'idle': len(self._idle),
+                'checked_out': self._size - len(self._idle),
+                'min_size': self.min_size,
+                'max_size': self.max_size
+            })
+        return status
+
+    def dispose(self):
+        """Close every idle connection"""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+
+        for connection, _, _ in idle:
+            self._close(connection)
+
+    def _open(self):
+        connection = pymysql.connect(**self.connect_args)
+        with self._cond:
+            self._metrics['connects'] += 1
+        return connection
+
+    def _check(self, entry):
+        """Recycle stale connections and pre-ping the rest before handing them out"""
+        connection, created_at, returned_at = entry
+        now = time.monotonic()
+
+        if now - created_at > self.recycle or now - returned_at > self.max_idle:
+            self._close(connection)
+            with self._cond:
+                self._metrics['recycled'] += 1
+            return self._open(), time.monotonic()
+
+        if self.pre_ping:
+            try:
+                connection.ping(reconnect=False)
+            except Exception:
+                self._close(connection)
+                with self._cond:
+                    self._metrics['ping_failures'] += 1
+                return self._open(), time.monotonic()
+
+        return connection, created_at
+
+    def _release(self, connection, created_at, discard=False):
+        expired = []
+
+        with self._cond:
+            if discard or os.getpid() != self.pid:
+                self._size -= 1
+                expired.append(connection)
+            else:
+                now = time.monotonic()
+                self._idle.append((connection, created_at, now))
+
+                # Trim connections idle for too long, oldest first, down to min_size
+                while self._size > self.min_size and now - self._idle[0][2] > self.max_idle:
+                    expired.append(self._idle.popleft()[0])
+                    self._size -= 1
+                    self._metrics['recycled'] += 1
+
+            self._cond.notify()
+
+        for connection in expired:
+            self._close(connection)
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    """Get the raw connection pool for the current app, creating it on first use"""
+    pool = current_app.extensions.get('raw_db_pool')
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+
+    with _pool_lock:
+        pool = current_app.extensions.get('raw_db_pool')
+        if pool is None or pool.pid != os.getpid():
+            # Never share sockets with a parent process after fork
+            config = current_app.config
+            pool = ConnectionPool(
+                connect_args={
+                    'host': config['DB_HOST'],
+                    'user': config['DB_USER'],
+                    'password': config['DB_PASSWORD'],
+                    'database': config['DB_NAME'],
+                    'charset': 'utf8mb4',
+                    'cursorclass': pymysql.cursors.DictCursor
+                },
+                min_size=config.get('DB_POOL_MIN_SIZE', 1),
+                max_size=config.get('DB_POOL_MAX_SIZE', 10),
+                recycle=config.get('DB_POOL_RECYCLE', 3600),
+                max_idle=config.get('DB_POOL_MAX_IDLE', 300),
+                pre_ping=config.get('DB_POOL_PRE_PING', True),
+                timeout=config.get('DB_POOL_TIMEOUT', 10.0)
+            )
+            current_app.extensions['raw_db_pool'] = pool
+
+    return pool
+
+def get_pool_status():
+    """Get metrics for whichever pool backs raw connections"""
+    if current_app.config.get('DB_POOL_USE_ENGINE'):
+        pool = db.engine.pool
+        return {
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow(),
+            'status': pool.status()
+        }
+    return get_pool().status()
 
 def get_db_connection():
-    """Get a raw database connection"""
+    """Get a raw database connection, close() returns it to the pool"""
     try:
-        connection = pymysql.connect(
-            host=current_app.config['DB_HOST'],
-            user=current_app.config['DB_USER'],
-            password=current_app.config['DB_PASSWORD'],
-            database=current_app.config['DB_NAME'],
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
-        )
-        return connection
+        if current_app.config.get('DB_POOL_USE_ENGINE'):
+            # Share the SQLAlchemy engine's pool so raw and ORM paths draw from one budget
+            return db.engine.raw_connection()
+        return get_pool().connect()
     except Exception as e:
         logging.error(f"Database connection error: {str(e)}")
         raise
@@ -23,21 +252,36 @@ def execute_query(query, params=None, fetch=True):
     """Execute a raw SQL query"""
     connection = get_db_connection()
     try:
-        with connection.cursor() as cursor:
+        # The engine's pool hands out whichever driver its URI names, so
+        # build dict rows from the cursor description rather than a
+        # driver-specific cursor class
+        with closing(connection.cursor()) as cursor:
             cursor.execute(query, params or ())
             if fetch:
-                return cursor.fetchall()
+                result = _fetch_dicts(cursor)
+                connection.commit()
+                return result
             connection.commit()
             return cursor.rowcount
     except Exception as e:
-        connection.rollback()
+        try:
+            connection.rollback()
+        except Exception:
+            # Connection is unusable, make sure it is not reused
+            connection.invalidate()
         logging.error(f"Query execution error: {str(e)}")
         raise
     finally:
         connection.close()
 
+def _fetch_dicts(cursor):
+    rows = cursor.fetchall()
+    if cursor.description is None:
+        return []
+    columns = [column[0] for column in cursor.description]
+    return [row if isinstance(row, dict) else dict(zip(columns, row)) for row in rows]
+
 def init_db():
     """Initialize the database"""
     db.create_all()
     logging.info("Database tables created")
-
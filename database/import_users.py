@@ -0,0 +1,38 @@
+"""Import users from a CSV or JSON Lines file.
+
+CSV needs a header row with username, email, password and optionally role;
+JSON Lines needs one object per line with the same keys.
+
+Usage: python -m database.import_users FILE [--format csv|jsonl] [--workers N]
+"""
+from app import create_app
+from app.services.user_import_service import UserImportService
+import argparse
+import json
+import os
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Import users from a CSV or JSON Lines file')
+    parser.add_argument('path', help='File to import')
+    parser.add_argument('--format', choices=UserImportService.FORMATS,
+                        help='Input format (default: from the file extension)')
+    parser.add_argument('--role', default='user', help='Role for rows that do not set one')
+    parser.add_argument('--chunk-size', type=int, default=None, help='Rows per batch')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Password hashing processes')
+    return parser.parse_args()
+
+def import_users():
+    """Run the import and print its report"""
+    args = parse_args()
+    fmt = args.format or ('jsonl' if args.path.endswith(('.jsonl', '.ndjson', '.json')) else 'csv')
+    
+    app = create_app(os.getenv('FLASK_ENV', 'development'))
+    app.config['PASSWORD_HASH_WORKERS'] = args.workers
+    
+    with app.app_context(), open(args.path, 'rb') as fh:
+        report = UserImportService.import_users(fh, fmt, default_role=args.role, chunk_size=args.chunk_size)
+    
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    import_users()
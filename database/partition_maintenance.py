@@ -0,0 +1,35 @@
+"""Create upcoming activities partitions and drop expired ones.
+
+Run daily (cron or a scheduled job); it is idempotent. Dropping a partition
+removes a whole month of activities at once, so expired rows never go
+through DELETE.
+
+Usage: python -m database.partition_maintenance [--retention-months N] [--months-ahead N] [--dry-run]
+"""
+from app import create_app
+from app.services.partition_service import PartitionService
+import argparse
+import json
+import os
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Maintain the monthly activities partitions')
+    parser.add_argument('--retention-months', type=int, default=None,
+                        help='Months of activities to keep (default: ACTIVITY_RETENTION_MONTHS)')
+    parser.add_argument('--months-ahead', type=int, default=None,
+                        help='Future months to pre-create (default: ACTIVITY_PARTITION_MONTHS_AHEAD)')
+    parser.add_argument('--dry-run', action='store_true', help='Only report what would change')
+    return parser.parse_args()
+
+def maintain_partitions():
+    """Run partition maintenance and print what changed"""
+    args = parse_args()
+    app = create_app(os.getenv('FLASK_ENV', 'development'))
+    
+    with app.app_context():
+        result = PartitionService.maintain(args.retention_months, args.months_ahead, args.dry_run)
+    
+    print(json.dumps(result, indent=2))
+
+if __name__ == '__main__':
+    maintain_partitions()
@@ -0,0 +1,40 @@
+"""Fold new activities into the daily rollups behind /activity/stats.
+
+Each run only reads activities with ids above the stored watermark, so it can
+run every minute from cron; --loop keeps it running instead. Set
+ACTIVITY_STATS_PER_USER=true to also keep per-user counts.
+
+Usage: python -m database.rollup_activities [--lag-seconds N] [--chunk-ids N] [--loop SECONDS]
+"""
+from app import create_app
+from app.services.activity_stats_service import ActivityStatsService
+import argparse
+import json
+import os
+import time
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Fold new activities into the daily rollups')
+    parser.add_argument('--lag-seconds', type=int, default=None,
+                        help='Skip activities younger than this (default: ACTIVITY_STATS_LAG_SECONDS)')
+    parser.add_argument('--chunk-ids', type=int, default=None,
+                        help='Activity ids per transaction (default: ACTIVITY_STATS_CHUNK_IDS)')
+    parser.add_argument('--loop', type=float, default=None, metavar='SECONDS',
+                        help='Keep running, catching up every SECONDS')
+    return parser.parse_args()
+
+def rollup_activities():
+    """Run the rollup catch-up once or in a loop and print each result"""
+    args = parse_args()
+    app = create_app(os.getenv('FLASK_ENV', 'development'))
+    
+    with app.app_context():
+        while True:
+            result = ActivityStatsService.catch_up(args.lag_seconds, args.chunk_ids)
+            print(json.dumps(result))
+            if args.loop is None:
+                break
+            time.sleep(args.loop)
+
+if __name__ == '__main__':
+    rollup_activities()
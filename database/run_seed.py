@@ -1,5 +1,45 @@
 from database.seed import seed_database
+import argparse
+import os
 
-if __name__ == '__main__':
-    seed_database()
+def parse_args():
+    parser = argparse.ArgumentParser(description='Seed the database')
+    parser.add_argument('--synthetic', action='store_true',
+                        help='Generate a production-sized data set instead of the demo users')
+    parser.add_argument('--users', type=int, default=100000, help='Synthetic users')
+    parser.add_argument('--activities', type=int, default=2000000, help='Synthetic activities')
+    parser.add_argument('--days', type=int, default=365, help='Days of history')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed; the same seed gives the same rows')
+    parser.add_argument('--batch-size', type=int, default=10000, help='Rows per INSERT')
+    parser.add_argument('--password-pool', type=int, default=16, help='Distinct passwords to hash')
+    parser.add_argument('--truncate', action='store_true', help='Delete all users and activities first')
+    parser.add_argument('--fast', action='store_true',
+                        help='On MySQL, skip foreign key and unique checks while loading')
+    return parser.parse_args()
+
+def seed_synthetic(args):
+    """Load synthetic users and activities"""
+    from app import create_app
+    from database.synthetic import SyntheticGenerator
+    
+    app = create_app(os.getenv('FLASK_ENV', 'development'))
+    with app.app_context():
+        generator = SyntheticGenerator(
+            users=args.users,
+            activities=args.activities,
+            seed=args.seed,
+            days=args.days,
+            batch_size=args.batch_size,
+            password_pool=args.password_pool
+        )
+        result = generator.run(truncate=args.truncate, fast=args.fast)
+    
+    print(f"Synthetic users start at id {result['first_user_id']}; "
+          f"user N's password is LoadTest<N mod {args.password_pool}, two digits>pass")
 
+if __name__ == '__main__':
+    args = parse_args()
+    if args.synthetic:
+        seed_synthetic(args)
+    else:
+        seed_database()
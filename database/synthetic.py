@@ -0,0 +1,221 @@
+from app import db
+from app.models.user import User
+from app.models.activity import Activity
+from app.services.password_service import PasswordService
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+import math
+import random
+import time
+
+# Relative frequency of each generated action; every user also gets one
+# user_registered row at creation time
+ACTIONS = [
+    ('user_login', 'User logged in successfully', 45),
+    ('user_logout', 'User logged out successfully', 30),
+    ('profile_updated', 'User profile updated', 8),
+    ('password_changed', 'User password changed', 2)
+]
+
+# Share of activity per hour of the day (UTC)
+HOUR_WEIGHTS = [2, 1, 1, 1, 1, 2, 4, 7, 10, 12, 12, 11, 10, 11, 12, 11, 10, 9, 9, 10, 10, 8, 5, 3]
+
+# Monday..Sunday
+WEEKDAY_WEIGHTS = [1.0, 1.0, 1.0, 1.0, 0.95, 0.7, 0.6]
+
+USER_AGENTS = [
+    ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36', 34),
+    ('Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1', 20),
+    ('Mozilla/5.0 (Linux; Android 13; SM-S911B) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Mobile Safari/537.36', 16),
+    ('Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.6 Safari/605.1.15', 12),
+    ('Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:118.0) Gecko/20100101 Firefox/118.0', 8),
+    ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36 Edg/117.0.2045.47', 6),
+    ('python-requests/2.31.0', 3),
+    ('curl/8.1.2', 1)
+]
+
+# Expanded so a user's usual agent can be picked from its id without an RNG call
+_AGENT_TABLE = [agent for agent, weight in USER_AGENTS for _ in range(weight)]
+
+# Exponent skewing activity towards older accounts (1 = uniform)
+ACTIVITY_SKEW = 2.0
+
+def password_for(user_id: int, pool_size: int) -> str:
+    """Plain-text password of a synthetic user, for load test scripts"""
+    return f'LoadTest{user_id % pool_size:02d}pass'
+
+def _home_ip(user_id: int) -> str:
+    h = (user_id * 2654435761) & 0xFFFFFFFF
+    return f'{11 + (h >> 24) % 212}.{(h >> 16) & 255}.{(h >> 8) & 255}.{1 + (h & 255) % 254}'
+
+def _random_ip(rng: random.Random) -> str:
+    return f'{rng.randint(11, 222)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}'
+
+class SyntheticGenerator:
+    """Deterministic generator of production-sized users and activities tables"""
+    
+    def __init__(self, users: int, activities: int, seed: int = 1, days: int = 365,
+                 batch_size: int = 10000, password_pool: int = 16, now: datetime = None):
+        self.users = users
+        self.activities = activities
+        self.seed = seed
+        self.days = days
+        self.batch_size = batch_size
+        self.password_pool = password_pool
+        # Fixed by default so the same seed always yields the same rows
+        self.now = now or datetime(2026, 1, 1)
+        self.start = self.now - timedelta(days=days)
+        self.rng = random.Random(seed)
+    
+    def created_at(self, index: int) -> datetime:
+        """Signup time of the index-th synthetic user: sign-ups grow over time"""
+        return self.start + timedelta(days=self.days * math.sqrt(index / self.users))
+    
+    def users_by_day(self, day: int) -> int:
+        """Number of synthetic users signed up by the end of a day"""
+        return min(self.users, int(self.users * ((day + 1) / self.days) ** 2))
+    
+    def run(self, truncate: bool = False, fast: bool = False) -> dict:
+        """Generate and insert everything on one connection, returns row counts"""
+        with db.engine.connect() as connection:
+            mysql = connection.dialect.name == 'mysql'
+            if fast and mysql:
+                # Safe here: ids are generated, unique and all referenced users exist
+                connection.exec_driver_sql('SET SESSION foreign_key_checks = 0')
+                connection.exec_driver_sql('SET SESSION unique_checks = 0')
+            
+            try:
+                if truncate:
+                    connection.execute(Activity.__table__.delete())
+                    connection.execute(User.__table__.delete())
+                    connection.commit()
+                
+                base_id = connection.execute(select(func.coalesce(func.max(User.id), 0))).scalar()
+                
+                started = time.perf_counter()
+                users = self._insert(connection, User.__table__, self._user_rows(base_id))
+                print(f'{users} users in {time.perf_counter() - started:.1f}s')
+                
+                started = time.perf_counter()
+                activities = self._insert(connection, Activity.__table__, self._activity_rows(base_id))
+                print(f'{activities} activities in {time.perf_counter() - started:.1f}s')
+            finally:
+                if fast and mysql:
+                    # Never hand the pooled connection back with the checks off
+                    connection.rollback()
+                    connection.exec_driver_sql('SET SESSION foreign_key_checks = 1')
+                    connection.exec_driver_sql('SET SESSION unique_checks = 1')
+        
+        return {'users': users, 'activities': activities, 'first_user_id': base_id + 1}
+    
+    def _insert(self, connection, table, rows) -> int:
+        count = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                connection.execute(table.insert(), batch)
+                connection.commit()
+                count += len(batch)
+                batch = []
+        if batch:
+            connection.execute(table.insert(), batch)
+            connection.commit()
+            count += len(batch)
+        return count
+    
+    def _user_rows(self, base_id: int):
+        rng = self.rng
+        # Key stretching a million times would take hours; share a few hashes
+        hashes = PasswordService.hash_many(
+            [password_for(index, self.password_pool) for index in range(self.password_pool)]
+        )
+        
+        for index in range(1, self.users + 1):
+            user_id = base_id + index
+            created_at = self.created_at(index)
+            is_deleted = rng.random() < 0.01
+            is_active = not is_deleted and rng.random() > 0.03
+            last_login = None
+            if is_active and rng.random() < 0.8:
+                last_login = created_at + (self.now - created_at) * (rng.random() ** 0.3)
+            
+            yield {
+                'id': user_id,
+                'username': f'load_{user_id:08d}',
+                'email': f'load_{user_id:08d}@loadtest.example',
+                'password_hash': hashes[user_id % self.password_pool],
+                'role': 'admin' if rng.random() < 0.001 else 'user',
+                'is_active': is_active,
+                'is_deleted': is_deleted,
+                'created_at': created_at,
+                'updated_at': last_login or created_at,
+                'last_login': last_login,
+                'token_version': 0
+            }
+    
+    def _activity_rows(self, base_id: int):
+        """Yield activities day by day in timestamp order, so ids follow time as in production"""
+        rng = self.rng
+        actions = [(action, details) for action, details, _ in ACTIONS]
+        action_weights = [weight for _, _, weight in ACTIONS]
+        hours = list(range(24))
+        
+        # Spread the requested total over days by active users and weekday
+        day_weights = [
+            self.users_by_day(day) * WEEKDAY_WEIGHTS[(self.start + timedelta(days=day)).weekday()]
+            for day in range(self.days)
+        ]
+        total_weight = sum(day_weights) or 1.0
+        carried = 0.0
+        signed_up = 0
+        
+        for day in range(self.days):
+            day_start = self.start + timedelta(days=day)
+            eligible = self.users_by_day(day)
+            rows = []
+            
+            # Registrations of the users who signed up that day
+            for index in range(signed_up + 1, eligible + 1):
+                rows.append(self._activity(base_id + index, 'user_registered', 'User registered successfully',
+                                           self.created_at(index), rng))
+            signed_up = eligible
+            
+            carried += self.activities * day_weights[day] / total_weight
+            count = int(carried)
+            carried -= count
+            if not eligible or not count:
+                rows.sort(key=lambda row: row['timestamp'])
+                yield from rows
+                continue
+            
+            day_hours = rng.choices(hours, weights=HOUR_WEIGHTS, k=count)
+            day_actions = rng.choices(actions, weights=action_weights, k=count)
+            for hour, (action, details) in zip(day_hours, day_actions):
+                index = 1 + int(eligible * rng.random() ** ACTIVITY_SKEW)
+                timestamp = day_start + timedelta(hours=hour, seconds=rng.random() * 3600)
+                # Nobody acts before signing up
+                timestamp = max(timestamp, self.created_at(index))
+                rows.append(self._activity(base_id + index, action, details, timestamp, rng))
+            
+            rows.sort(key=lambda row: row['timestamp'])
+            yield from rows
+    
+    @staticmethod
+    def _activity(user_id: int, action: str, details: str, timestamp: datetime, rng: random.Random) -> dict:
+        # Most requests come from the user's usual device and network
+        if rng.random() < 0.8:
+            user_agent = _AGENT_TABLE[(user_id * 7919) % len(_AGENT_TABLE)]
+            ip_address = _home_ip(user_id)
+        else:
+            user_agent = _AGENT_TABLE[rng.randrange(len(_AGENT_TABLE))]
+            ip_address = _random_ip(rng)
+        
+        return {
+            'user_id': user_id,
+            'action': action,
+            'details': details,
+            'ip_address': ip_address,
+            'user_agent': user_agent,
+            'timestamp': timestamp
+        }
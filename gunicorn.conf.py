@@ -0,0 +1,31 @@
+# Gunicorn configuration
+# Usage: gunicorn -c gunicorn.conf.py
+import os
+import shutil
+
+# Shared directory for the Prometheus multiprocess collector; it has to be set
+# before the app (and prometheus_client) is imported in any worker
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/flask_app_metrics')
+
+wsgi_app = 'run:app'
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', 4))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+graceful_timeout = 30
+
+def on_starting(server):
+    """Start from an empty metrics directory so old workers are not counted"""
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+def child_exit(server, worker):
+    """Drop the live gauges of a worker that has exited"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+def worker_exit(server, worker):
+    """Drain queued activities before the worker process goes away"""
+    from app.services.activity_writer import activity_writer
+    activity_writer.shutdown()
@@ -0,0 +1,39 @@
+"""Add activity daily stats rollups
+
+Revision ID: a7c2e9d45b13
+Revises: f3a9c6d18e27
+Create Date: 2026-10-18 16:40:12.533918
+
+The tables start empty; the first database/rollup_activities.py run folds in
+all existing activities.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c2e9d45b13'
+down_revision = 'f3a9c6d18e27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('activity_daily_stats',
+    sa.Column('user_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('action', sa.String(length=100), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('user_id', 'day', 'action')
+    )
+    op.create_table('activity_stats_state',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('last_id', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('activity_stats_state')
+    op.drop_table('activity_daily_stats')
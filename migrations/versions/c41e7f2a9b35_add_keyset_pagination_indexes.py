@@ -0,0 +1,28 @@
+"""Add keyset pagination indexes
+
+Revision ID: c41e7f2a9b35
+Revises: b74d2298dd73
+Create Date: 2026-10-18 09:12:44.218307
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41e7f2a9b35'
+down_revision = 'b74d2298dd73'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('activities', schema=None) as batch_op:
+        batch_op.create_index('ix_activities_timestamp_id', ['timestamp', 'id'], unique=False)
+        batch_op.create_index('ix_activities_user_id_timestamp_id', ['user_id', 'timestamp', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('activities', schema=None) as batch_op:
+        batch_op.drop_index('ix_activities_user_id_timestamp_id')
+        batch_op.drop_index('ix_activities_timestamp_id')
@@ -0,0 +1,26 @@
+"""Add user token version
+
+Revision ID: e5d2b8c71f04
+Revises: c41e7f2a9b35
+Create Date: 2026-10-18 11:40:02.587113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5d2b8c71f04'
+down_revision = 'c41e7f2a9b35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('token_version')
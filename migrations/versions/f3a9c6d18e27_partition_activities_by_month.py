@@ -0,0 +1,103 @@
+"""Partition activities by month
+
+Revision ID: f3a9c6d18e27
+Revises: e5d2b8c71f04
+Create Date: 2026-10-18 15:12:44.208391
+
+Partitioning is MySQL only. MySQL cannot partition a table with foreign keys
+and requires the partitioning column in every unique key, so the user_id
+foreign key is dropped and the primary key becomes (id, timestamp). The
+foreign key is dropped on every dialect so the schema matches the model;
+other dialects otherwise just get the NOT NULL timestamp. The ALTERs rebuild the table: run this in a
+maintenance window (or with an online schema change tool) on large tables.
+
+Partitions are named pYYYYMM and hold that calendar month; p_future catches
+anything past the last one and is kept empty by database/partition_maintenance.py.
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import date, datetime
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a9c6d18e27'
+down_revision = 'e5d2b8c71f04'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+# Names the unnamed foreign key of the initial migration on SQLite
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+
+def add_months(day, months):
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def upgrade():
+    bind = op.get_bind()
+    op.execute("UPDATE activities SET timestamp = CURRENT_TIMESTAMP WHERE timestamp IS NULL")
+    
+    foreign_keys = sa.inspect(bind).get_foreign_keys('activities')
+    
+    if bind.dialect.name != 'mysql':
+        with op.batch_alter_table('activities', schema=None, naming_convention=NAMING_CONVENTION) as batch_op:
+            for foreign_key in foreign_keys:
+                batch_op.drop_constraint(foreign_key['name'] or 'fk_activities_user_id_users', type_='foreignkey')
+            batch_op.alter_column('timestamp', existing_type=sa.DateTime(), nullable=False)
+        return
+    
+    for foreign_key in foreign_keys:
+        op.drop_constraint(foreign_key['name'], 'activities', type_='foreignkey')
+    
+    op.execute(
+        "ALTER TABLE activities "
+        "MODIFY `timestamp` DATETIME NOT NULL, "
+        "DROP PRIMARY KEY, ADD PRIMARY KEY (id, `timestamp`)"
+    )
+    
+    oldest = bind.execute(sa.text("SELECT MIN(`timestamp`) FROM activities")).scalar()
+    this_month = datetime.utcnow().date().replace(day=1)
+    month = (oldest.date() if oldest else this_month).replace(day=1)
+    
+    partitions = []
+    while month <= add_months(this_month, MONTHS_AHEAD):
+        partitions.append(
+            f"PARTITION p{month:%Y%m} VALUES LESS THAN ('{add_months(month, 1):%Y-%m-%d}')"
+        )
+        month = add_months(month, 1)
+    partitions.append("PARTITION p_future VALUES LESS THAN (MAXVALUE)")
+    
+    op.execute(
+        "ALTER TABLE activities PARTITION BY RANGE COLUMNS(`timestamp`) (" + ", ".join(partitions) + ")"
+    )
+
+
+def downgrade():
+    bind = op.get_bind()
+    
+    # Check before changing anything: MySQL DDL is not transactional
+    orphans = bind.execute(sa.text(
+        "SELECT COUNT(*) FROM activities WHERE user_id NOT IN (SELECT id FROM users)"
+    )).scalar()
+    if orphans:
+        raise RuntimeError(
+            f'{orphans} activities belong to deleted users; archive or delete them '
+            'before restoring the foreign key'
+        )
+    
+    if bind.dialect.name != 'mysql':
+        with op.batch_alter_table('activities', schema=None, naming_convention=NAMING_CONVENTION) as batch_op:
+            batch_op.alter_column('timestamp', existing_type=sa.DateTime(), nullable=True)
+            batch_op.create_foreign_key('fk_activities_user_id_users', 'users', ['user_id'], ['id'])
+        return
+    
+    op.execute("ALTER TABLE activities REMOVE PARTITIONING")
+    op.execute(
+        "ALTER TABLE activities "
+        "DROP PRIMARY KEY, ADD PRIMARY KEY (id), "
+        "MODIFY `timestamp` DATETIME NULL"
+    )
+    op.create_foreign_key(None, 'activities', 'users', ['user_id'], ['id'])